@@ -1,19 +1,35 @@
 """
 Core services and utilities for YouTube 4K Checker
+Submodules are imported on first attribute access (PEP 562) to keep startup fast
 """
 
-from .theme import ThemeConfig
-from .youtube_service import YouTubeAPIService
-from .video_checker import Video4KChecker
-from .thumbnail_manager import ThumbnailManager
-from .ui_manager import UIManager
-from .config_manager import ConfigManager
+_LAZY_EXPORTS = {
+    'ThemeConfig': '.theme',
+    'YouTubeAPIService': '.youtube_service',
+    'Video4KChecker': '.video_checker',
+    'ThumbnailManager': '.thumbnail_manager',
+    'ThumbnailLoader': '.thumbnail_loader',
+    'ThumbnailPackStore': '.thumbnail_store',
+    'UIManager': '.ui_manager',
+    'ConfigManager': '.config_manager',
+    'VideoSearchIndex': '.search_index',
+    'VideoCatalog': '.catalog',
+    'StartupTimer': '.startup_timing',
+    'startup_timer': '.startup_timing'
+}
 
-__all__ = [
-    'ThemeConfig',
-    'YouTubeAPIService', 
-    'Video4KChecker',
-    'ThumbnailManager',
-    'UIManager',
-    'ConfigManager'
-]
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from .startup_timing import startup_timer
+    value = getattr(startup_timer.import_module(module_name, __name__), name)
+    globals()[name] = value  # Cache so __getattr__ is not hit again
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
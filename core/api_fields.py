@@ -0,0 +1,65 @@
+"""
+Partial-response projections for Data API calls
+Maps each method and requested part to the fields the app actually reads
+"""
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# methodId -> (top-level fields, {part: item sub-selection})
+FIELD_PROJECTIONS = {
+    'youtube.videos.list': ('', {
+        'id': '',
+        'snippet': 'snippet(title,channelTitle,publishedAt,defaultAudioLanguage,defaultLanguage,thumbnails/medium/url)',
+        'contentDetails': 'contentDetails(definition,dimension)',
+        'statistics': 'statistics(viewCount,likeCount,commentCount)'
+    }),
+    'youtube.playlistItems.list': ('nextPageToken', {
+        'id': '',
+        'snippet': 'snippet(title,channelTitle,publishedAt,resourceId/videoId,thumbnails/medium/url)',
+        'contentDetails': 'contentDetails/videoId'
+    }),
+    'youtube.playlists.list': ('', {
+        'id': '',
+        'snippet': 'snippet(title,description,channelTitle,publishedAt,thumbnails/medium/url)',
+        'contentDetails': 'contentDetails/itemCount'
+    }),
+    'youtube.channels.list': ('', {
+        'id': '',
+        'snippet': 'snippet/title',
+        'contentDetails': 'contentDetails/relatedPlaylists/uploads'
+    }),
+    'youtube.search.list': ('pageInfo/totalResults', {
+        'id': '',
+        'snippet': ''
+    })
+}
+
+def projection_for(method_id, parts):
+    """fields= value for method_id with the given parts, or None if unknown"""
+    projection = FIELD_PROJECTIONS.get(method_id)
+    if projection is None:
+        return None
+    top_level, part_fields = projection
+    selections = ['id']
+    for part in parts:
+        if part not in part_fields:
+            return None  # A part we have no projection for: ask for everything
+        if part_fields[part]:
+            selections.append(part_fields[part])
+    items = f"items({','.join(selections)})"
+    return f"{top_level},{items}" if top_level else items
+
+def apply_projection(uri, method_id):
+    """Add fields= to a request URI unless the caller already set one"""
+    scheme, netloc, path, query, fragment = urlsplit(uri)
+    params = parse_qsl(query, keep_blank_values=True)
+    if any(key == 'fields' for key, _ in params):
+        return uri
+    parts = []
+    for key, value in params:
+        if key == 'part':
+            parts.extend(p.strip() for p in value.split(',') if p.strip())
+    fields = projection_for(method_id, parts)
+    if not fields:
+        return uri
+    params.append(('fields', fields))
+    return urlunsplit((scheme, netloc, path, urlencode(params), fragment))
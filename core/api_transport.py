@@ -0,0 +1,81 @@
+"""
+Data API transport pool
+Gives every thread its own httplib2 transport over shared credentials
+"""
+import threading
+from .api_fields import apply_projection
+from .startup_timing import startup_timer
+
+class _SerializedCredentials:
+    """Credentials proxy that lets only one thread refresh the token at a time"""
+
+    def __init__(self, credentials, lock):
+        self._credentials = credentials
+        self._lock = lock
+
+    def before_request(self, request, method, url, headers):
+        # May refresh an expired token; other threads wait and reuse the new one
+        with self._lock:
+            self._credentials.before_request(request, method, url, headers)
+
+    def refresh(self, request):
+        with self._lock:
+            self._credentials.refresh(request)
+
+    def __getattr__(self, name):
+        return getattr(self._credentials, name)
+
+
+class ApiTransportPool:
+    """
+    httplib2.Http is not thread-safe, so one client shared by the loader, info and
+    removal threads must not share one connection. Requests built through
+    request_builder execute on the calling thread's own transport, which keeps its
+    connections open for reuse by that thread.
+    """
+
+    def __init__(self, credentials=None, timeout=30):
+        self.credentials = credentials
+        self.timeout = timeout
+        self._refresh_lock = threading.Lock()
+        self._local = threading.local()
+        self._created = 0
+        self._count_lock = threading.Lock()
+
+    def http(self):
+        """This thread's transport (authorized when credentials are set)"""
+        transport = getattr(self._local, 'http', None)
+        if transport is None:
+            httplib2 = startup_timer.import_module('httplib2')
+            transport = httplib2.Http(timeout=self.timeout)
+            if self.credentials is not None:
+                google_auth_httplib2 = startup_timer.import_module('google_auth_httplib2')
+                transport = google_auth_httplib2.AuthorizedHttp(
+                    _SerializedCredentials(self.credentials, self._refresh_lock),
+                    http=transport
+                )
+            self._local.http = transport
+            with self._count_lock:
+                self._created += 1
+        return transport
+
+    def request_builder(self, http, postproc, uri, *args, headers=None, methodId=None, **kwargs):
+        """
+        requestBuilder for googleapiclient: ignore the client's http, use this thread's
+        Also trims the response to the fields the app reads and makes sure it is gzipped.
+        """
+        http_module = startup_timer.import_module('googleapiclient.http')
+        uri = apply_projection(uri, methodId)
+        headers = dict(headers or {})
+        headers.setdefault('accept-encoding', 'gzip, deflate')
+        # Google only compresses for clients whose User-Agent contains "gzip"
+        user_agent = headers.get('user-agent', '')
+        if 'gzip' not in user_agent:
+            headers['user-agent'] = f"{user_agent} (gzip)".strip()
+        return http_module.HttpRequest(
+            self.http(), postproc, uri, *args, headers=headers, methodId=methodId, **kwargs
+        )
+
+    def get_stats(self):
+        with self._count_lock:
+            return {'transports_created': self._created}
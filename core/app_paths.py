@@ -0,0 +1,25 @@
+"""
+Application data paths
+Resolves the per-user writable directory used for tokens, sessions and catalogs
+"""
+import os
+
+APP_DIR_NAME = 'youtube_4k_checker'
+
+def get_app_data_dir(*parts):
+    """
+    Return (and create) the per-user app directory, optionally joined with parts
+    Windows: %LOCALAPPDATA%/youtube_4k_checker, elsewhere: ~/.config/youtube_4k_checker
+    """
+    try:
+        if os.name == 'nt':
+            base_dir = os.getenv('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+        else:
+            base_dir = os.path.join(os.path.expanduser('~'), '.config')
+        path = os.path.join(base_dir, APP_DIR_NAME, *parts)
+        os.makedirs(path, exist_ok=True)
+    except Exception:
+        # Fallback to current working directory
+        path = os.path.join(os.getcwd(), *parts) if parts else os.getcwd()
+        os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,372 @@
+"""
+Local video catalog
+Embedded SQLite database for videos, playlists, 4K results and copy history
+"""
+import os
+import time
+import sqlite3
+import threading
+from .app_paths import get_app_data_dir
+
+class VideoCatalog:
+    """SQLite-backed catalog with indexed lookups; safe to share across threads"""
+
+    SCHEMA_VERSION = 2
+    # SQLite's default limit on host parameters per statement is 999
+    MAX_PARAMS = 900
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(get_app_data_dir(), 'catalog.sqlite3')
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._copied_ids = None  # In-memory copy history, loaded on first use
+        self._setup()
+
+    def _setup(self):
+        with self._lock:
+            conn = self._conn
+            try:
+                # WAL: appends instead of rewriting pages in place, readers never block
+                conn.execute('PRAGMA journal_mode=WAL')
+                conn.execute('PRAGMA synchronous=NORMAL')
+            except sqlite3.DatabaseError as e:
+                print(f"Catalog pragma warning: {e}")
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS videos (
+                    video_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    channel_title TEXT,
+                    thumbnail TEXT,
+                    definition TEXT,
+                    dimension TEXT,
+                    published_at TEXT,
+                    default_audio_language TEXT,
+                    default_language TEXT,
+                    is_english INTEGER DEFAULT 0,
+                    updated_at REAL,
+                    details_fetched_at REAL,
+                    view_count INTEGER,
+                    like_count INTEGER,
+                    comment_count INTEGER,
+                    stats_fetched_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS playlists (
+                    playlist_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    channel_title TEXT,
+                    video_count INTEGER,
+                    updated_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS playlist_videos (
+                    playlist_id TEXT NOT NULL,
+                    video_id TEXT NOT NULL,
+                    position INTEGER,
+                    playlist_item_id TEXT,
+                    PRIMARY KEY (playlist_id, video_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_playlist_videos_video ON playlist_videos(video_id);
+                CREATE TABLE IF NOT EXISTS check_results (
+                    video_id TEXT PRIMARY KEY,
+                    status TEXT,
+                    checked_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS copy_history (
+                    video_id TEXT PRIMARY KEY,
+                    copied_at REAL
+                );
+            ''')
+            self._migrate(conn)
+            conn.execute(f'PRAGMA user_version={self.SCHEMA_VERSION}')
+            conn.commit()
+
+    def _migrate(self, conn):
+        """Add columns introduced after a catalog file was created"""
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(videos)')}
+        added = {
+            'details_fetched_at': 'REAL',
+            'view_count': 'INTEGER',
+            'like_count': 'INTEGER',
+            'comment_count': 'INTEGER',
+            'stats_fetched_at': 'REAL'
+        }
+        for name, col_type in added.items():
+            if name not in columns:
+                conn.execute(f'ALTER TABLE videos ADD COLUMN {name} {col_type}')
+
+    def close(self):
+        with self._lock:
+            try:
+                self._conn.commit()
+                self._conn.close()
+            except Exception:
+                pass
+
+    def _chunks(self, items):
+        items = list(items)
+        for i in range(0, len(items), self.MAX_PARAMS):
+            yield items[i:i + self.MAX_PARAMS]
+
+    # --- Videos ------------------------------------------------------------
+
+    def upsert_videos(self, videos, fetched_at=None, stats_fetched_at=None):
+        """
+        Insert or update video rows from detail dicts (as built by get_video_details)
+        fetched_at / stats_fetched_at mark the rows as fresh API data; without them
+        the previous freshness is kept, so re-saving cached rows does not extend it.
+        """
+        now = time.time()
+        rows = []
+        for video in videos:
+            vid = video.get('id')
+            # Placeholder details of a failed fetch never replace catalog rows
+            if not vid or video.get('details_unavailable'):
+                continue
+            stats = video.get('statistics') or {}
+            rows.append((
+                vid,
+                video.get('title', ''),
+                video.get('channel_title', ''),
+                video.get('thumbnail', ''),
+                video.get('definition', 'hd'),
+                video.get('dimension', '2d'),
+                video.get('published_at', ''),
+                video.get('default_audio_language', ''),
+                video.get('default_language', ''),
+                1 if video.get('is_english') else 0,
+                now,
+                fetched_at,
+                stats.get('view_count'),
+                stats.get('like_count'),
+                stats.get('comment_count'),
+                stats_fetched_at if stats else None
+            ))
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany('''
+                INSERT INTO videos (video_id, title, channel_title, thumbnail, definition, dimension,
+                                    published_at, default_audio_language, default_language, is_english, updated_at,
+                                    details_fetched_at, view_count, like_count, comment_count, stats_fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(video_id) DO UPDATE SET
+                    title=excluded.title,
+                    channel_title=excluded.channel_title,
+                    thumbnail=excluded.thumbnail,
+                    definition=excluded.definition,
+                    dimension=excluded.dimension,
+                    published_at=excluded.published_at,
+                    default_audio_language=excluded.default_audio_language,
+                    default_language=excluded.default_language,
+                    is_english=excluded.is_english,
+                    updated_at=excluded.updated_at,
+                    details_fetched_at=COALESCE(excluded.details_fetched_at, videos.details_fetched_at),
+                    view_count=COALESCE(excluded.view_count, videos.view_count),
+                    like_count=COALESCE(excluded.like_count, videos.like_count),
+                    comment_count=COALESCE(excluded.comment_count, videos.comment_count),
+                    stats_fetched_at=COALESCE(excluded.stats_fetched_at, videos.stats_fetched_at)
+            ''', rows)
+            self._conn.commit()
+        return len(rows)
+
+    def update_video_statistics(self, statistics, fetched_at=None):
+        """Store {video_id: {'view_count', 'like_count', 'comment_count'}} without touching details"""
+        fetched_at = fetched_at or time.time()
+        rows = [
+            (stats.get('view_count'), stats.get('like_count'), stats.get('comment_count'), fetched_at, vid)
+            for vid, stats in statistics.items() if vid
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany('''
+                UPDATE videos SET view_count=?, like_count=?, comment_count=?, stats_fetched_at=?
+                WHERE video_id=?
+            ''', rows)
+            self._conn.commit()
+        return len(rows)
+
+    def _video_from_row(self, row):
+        video_id = row['video_id']
+        return {
+            'id': video_id,
+            'title': row['title'] or '',
+            'url': f"https://www.youtube.com/watch?v={video_id}",
+            'definition': row['definition'] or 'hd',
+            'dimension': row['dimension'] or '2d',
+            'thumbnail': row['thumbnail'] or '',
+            'channel_title': row['channel_title'] or '',
+            'published_at': row['published_at'] or '',
+            'default_audio_language': row['default_audio_language'] or '',
+            'default_language': row['default_language'] or '',
+            'is_english': bool(row['is_english'])
+        }
+
+    def get_videos(self, video_ids):
+        """Return {video_id: details} for the IDs present in the catalog"""
+        result = {}
+        with self._lock:
+            for chunk in self._chunks(video_ids):
+                marks = ','.join('?' * len(chunk))
+                for row in self._conn.execute(f'SELECT * FROM videos WHERE video_id IN ({marks})', chunk):
+                    result[row['video_id']] = self._video_from_row(row)
+        return result
+
+    def get_cached_details(self, video_ids, details_ttl, stats_ttl=None):
+        """
+        Split video_ids by freshness of their API metadata
+        Returns (fresh {video_id: details}, stale_ids, stats_stale_ids): stale_ids need
+        a full fetch; stats_stale_ids have fresh details and only need statistics.
+        stats_ttl=None means statistics are not wanted.
+        """
+        now = time.time()
+        fresh = {}
+        stats_stale = []
+        with self._lock:
+            for chunk in self._chunks(dict.fromkeys(video_ids)):
+                marks = ','.join('?' * len(chunk))
+                for row in self._conn.execute(f'SELECT * FROM videos WHERE video_id IN ({marks})', chunk):
+                    fetched = row['details_fetched_at']
+                    if not fetched or now - fetched > details_ttl:
+                        continue
+                    video = self._video_from_row(row)
+                    if stats_ttl is not None:
+                        stats_fetched = row['stats_fetched_at']
+                        if not stats_fetched or now - stats_fetched > stats_ttl:
+                            stats_stale.append(row['video_id'])
+                        else:
+                            video['statistics'] = {
+                                'view_count': row['view_count'],
+                                'like_count': row['like_count'],
+                                'comment_count': row['comment_count']
+                            }
+                    fresh[row['video_id']] = video
+        stale = [vid for vid in dict.fromkeys(video_ids) if vid not in fresh]
+        return fresh, stale, stats_stale
+
+    # --- Playlists ---------------------------------------------------------
+
+    def upsert_playlist(self, playlist_id, info=None):
+        info = info or {}
+        with self._lock:
+            self._conn.execute('''
+                INSERT INTO playlists (playlist_id, title, channel_title, video_count, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(playlist_id) DO UPDATE SET
+                    title=COALESCE(excluded.title, playlists.title),
+                    channel_title=COALESCE(excluded.channel_title, playlists.channel_title),
+                    video_count=COALESCE(excluded.video_count, playlists.video_count),
+                    updated_at=excluded.updated_at
+            ''', (playlist_id, info.get('title'), info.get('channel_title'), info.get('video_count'), time.time()))
+            self._conn.commit()
+
+    def set_playlist_videos(self, playlist_id, videos):
+        """Replace a playlist's membership with videos, in order"""
+        rows = [
+            (playlist_id, v.get('id'), position, v.get('playlist_item_id'))
+            for position, v in enumerate(videos) if v.get('id')
+        ]
+        with self._lock:
+            self._conn.execute('DELETE FROM playlist_videos WHERE playlist_id = ?', (playlist_id,))
+            self._conn.executemany('''
+                INSERT OR REPLACE INTO playlist_videos (playlist_id, video_id, position, playlist_item_id)
+                VALUES (?, ?, ?, ?)
+            ''', rows)
+            self._conn.commit()
+
+    def get_playlist(self, playlist_id):
+        with self._lock:
+            row = self._conn.execute('SELECT * FROM playlists WHERE playlist_id = ?', (playlist_id,)).fetchone()
+        return dict(row) if row else None
+
+    def get_playlist_videos(self, playlist_id):
+        """Catalog rows of a playlist in stored order, with last 4K result"""
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT v.*, pv.playlist_item_id, r.status AS check_status
+                FROM playlist_videos pv
+                JOIN videos v ON v.video_id = pv.video_id
+                LEFT JOIN check_results r ON r.video_id = pv.video_id
+                WHERE pv.playlist_id = ?
+                ORDER BY pv.position
+            ''', (playlist_id,)).fetchall()
+        videos = []
+        for row in rows:
+            video = self._video_from_row(row)
+            video['playlist_item_id'] = row['playlist_item_id']
+            if row['check_status']:
+                video['4k_status'] = row['check_status']
+            videos.append(video)
+        return videos
+
+    # --- 4K results --------------------------------------------------------
+
+    def record_check_results(self, results):
+        """Store {video_id: status} verdicts"""
+        now = time.time()
+        rows = [(vid, status, now) for vid, status in results.items() if vid]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany('''
+                INSERT INTO check_results (video_id, status, checked_at) VALUES (?, ?, ?)
+                ON CONFLICT(video_id) DO UPDATE SET status=excluded.status, checked_at=excluded.checked_at
+            ''', rows)
+            self._conn.commit()
+
+    def record_check_result(self, video_id, status):
+        self.record_check_results({video_id: status})
+
+    def get_check_results(self, video_ids):
+        result = {}
+        with self._lock:
+            for chunk in self._chunks(video_ids):
+                marks = ','.join('?' * len(chunk))
+                for row in self._conn.execute(
+                        f'SELECT video_id, status FROM check_results WHERE video_id IN ({marks})', chunk):
+                    result[row['video_id']] = row['status']
+        return result
+
+    # --- Copy history ------------------------------------------------------
+
+    def _load_copied_ids(self):
+        """Load copy history into memory once; lookups never touch the database"""
+        with self._lock:
+            if self._copied_ids is None:
+                self._copied_ids = {row['video_id'] for row in self._conn.execute('SELECT video_id FROM copy_history')}
+            return self._copied_ids
+
+    def mark_copied(self, video_ids):
+        """Record copies; returns how many IDs were new"""
+        with self._lock:
+            copied = self._load_copied_ids()
+            new_ids = [vid for vid in dict.fromkeys(video_ids) if vid and vid not in copied]
+            if not new_ids:
+                return 0
+            copied.update(new_ids)
+            # Only new IDs are appended; with WAL + synchronous=NORMAL the commit is
+            # a log append and fsyncs are batched at checkpoints
+            now = time.time()
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO copy_history (video_id, copied_at) VALUES (?, ?)',
+                [(vid, now) for vid in new_ids]
+            )
+            self._conn.commit()
+            return len(new_ids)
+
+    def is_copied(self, video_id):
+        if not video_id:
+            return False
+        return video_id in self._load_copied_ids()
+
+    def copied_among(self, video_ids):
+        """Subset of video_ids that were copied before"""
+        copied = self._load_copied_ids()
+        return {vid for vid in video_ids if vid in copied}
+
+    def get_copied_ids(self):
+        with self._lock:
+            return set(self._load_copied_ids())
+
+    def copy_history_count(self):
+        return len(self._load_copied_ids())
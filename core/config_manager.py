@@ -3,8 +3,11 @@ Configuration management service
 Handles application settings and configuration
 """
 import os
+import copy
 import json
-from typing import Dict, Any, Optional
+import tempfile
+import threading
+from typing import Callable, Dict, Any, Optional
 
 class ConfigManager:
     """Manages application configuration and settings"""
@@ -28,10 +31,15 @@ class ConfigManager:
         # Thumbnail settings
         'thumbnails': {
             'cache_dir': 'thumbnails',
-            'max_cache_size': 100,
+            'memory_cache_mb': 64,
             'thumbnail_size': [50, 50],
             'preload_enabled': True,
-            'use_disk_cache': True
+            'use_disk_cache': True,
+            'download_workers': 4,
+            'disk_cache_mb': 256,
+            'max_age_days': 30,
+            'maintenance_interval_minutes': 10,
+            'revalidate_after_hours': 168
         },
         
         # UI settings
@@ -40,7 +48,14 @@ class ConfigManager:
             'window_size': [1000, 700],
             'window_position': None,
             'auto_check_4k': True,
-            'show_thumbnails': True
+            'show_thumbnails': True,
+            'restore_last_session': True
+        },
+        
+        # Last loaded playlist, restored from the catalog at startup
+        'session': {
+            'last_playlist_id': '',
+            'last_max_results': 50
         },
         
         # Advanced settings
@@ -52,9 +67,18 @@ class ConfigManager:
         }
     }
     
-    def __init__(self, config_file='config.json'):
+    def __init__(self, config_file='config.json', write_behind=False, save_delay=0.5):
         self.config_file = config_file
-        self.config = self.DEFAULT_CONFIG.copy()
+        self.config = copy.deepcopy(self.DEFAULT_CONFIG)
+        # Write-behind: save_config() only schedules a write, coalescing bursts
+        self.write_behind = write_behind
+        self.save_delay = save_delay
+        self._lock = threading.RLock()
+        # Held for a whole file write: timer writes, flush() and direct saves never overlap
+        self._write_lock = threading.Lock()
+        self._save_timer = None
+        self._save_pending = False
+        self._subscribers = []  # (prefix, callback)
         self._load_config()
     
     def _load_config(self):
@@ -79,15 +103,121 @@ class ConfigManager:
                     result[key] = value
             return result
         
-        self.config = merge_dict(self.DEFAULT_CONFIG, loaded_config)
+        with self._lock:
+            old_config = self.config
+            self.config = merge_dict(copy.deepcopy(self.DEFAULT_CONFIG), loaded_config)
+        self._notify_sections(old_config, self.config)
     
     def save_config(self):
-        """Save current configuration to file"""
+        """Save current configuration to file (deferred in write-behind mode)"""
+        if self.write_behind:
+            self._schedule_save()
+        else:
+            self._write_config()
+    
+    def _schedule_save(self):
+        """(Re)start the debounce timer; the write happens on the timer thread"""
+        with self._lock:
+            self._save_pending = True
+            if self._save_timer is not None:
+                self._save_timer.cancel()
+            self._save_timer = threading.Timer(self.save_delay, self._write_pending)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+    
+    def flush(self):
+        """Write a pending deferred save now, or wait for one in progress (call before exit)"""
+        with self._lock:
+            timer, self._save_timer = self._save_timer, None
+        if timer is not None:
+            timer.cancel()
+        self._write_pending()
+    
+    def _write_pending(self):
+        with self._write_lock:
+            if self._save_pending:
+                self._write_file()
+    
+    def _write_config(self):
+        with self._write_lock:
+            self._write_file()
+    
+    def _write_file(self):
+        """Write to a unique temp file and rename over config.json so it is never torn (hold _write_lock)"""
+        with self._lock:
+            self._save_pending = False
+            try:
+                data = json.dumps(self.config, indent=2, ensure_ascii=False)
+            except Exception as e:
+                print(f"Error saving config: {e}")
+                return
+        directory = os.path.dirname(os.path.abspath(self.config_file))
+        tmp_path = None
         try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=2, ensure_ascii=False)
+            fd, tmp_path = tempfile.mkstemp(
+                dir=directory, prefix=os.path.basename(self.config_file) + '.', suffix='.tmp'
+            )
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.config_file)
         except Exception as e:
             print(f"Error saving config: {e}")
+            try:
+                if tmp_path and os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+            except Exception:
+                pass
+    
+    def subscribe(self, callback: Callable[[str, Any, Any], None], prefix: str = ''):
+        """
+        Call callback(key_path, old_value, new_value) when a key under prefix changes
+        Callbacks run on the thread that made the change.
+        """
+        with self._lock:
+            self._subscribers.append((prefix, callback))
+        return callback
+    
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers = [(p, cb) for p, cb in self._subscribers if cb is not callback]
+    
+    def _notify(self, key_path: str, old_value: Any, new_value: Any):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for prefix, callback in subscribers:
+            # Match the key itself and keys below prefix
+            if not prefix or key_path == prefix or key_path.startswith(prefix + '.'):
+                args = (key_path, old_value, new_value)
+            elif prefix.startswith(key_path + '.'):
+                # A section containing prefix changed: report the subscriber's own value
+                rest = prefix[len(key_path) + 1:].split('.')
+                old_leaf = self._lookup(old_value, rest)
+                new_leaf = self._lookup(new_value, rest)
+                if old_leaf == new_leaf:
+                    continue
+                args = (prefix, old_leaf, new_leaf)
+            else:
+                continue
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error in config subscriber: {e}")
+    
+    @staticmethod
+    def _lookup(value, keys):
+        """Value at keys below a section dict, or None if missing"""
+        for key in keys:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        return value
+    
+    def _notify_sections(self, old_config, new_config):
+        for section in set(old_config) | set(new_config):
+            if old_config.get(section) != new_config.get(section):
+                self._notify(section, old_config.get(section), new_config.get(section))
     
     def get(self, key_path: str, default=None) -> Any:
         """
@@ -110,16 +240,20 @@ class ConfigManager:
         Example: set('youtube.api_key', 'your_api_key')
         """
         keys = key_path.split('.')
-        config_ref = self.config
-        
-        # Navigate to parent
-        for key in keys[:-1]:
-            if key not in config_ref:
-                config_ref[key] = {}
-            config_ref = config_ref[key]
-        
-        # Set final value
-        config_ref[keys[-1]] = value
+        with self._lock:
+            config_ref = self.config
+            
+            # Navigate to parent
+            for key in keys[:-1]:
+                if key not in config_ref:
+                    config_ref[key] = {}
+                config_ref = config_ref[key]
+            
+            # Set final value
+            old_value = config_ref.get(keys[-1])
+            config_ref[keys[-1]] = value
+        if old_value != value:
+            self._notify(key_path, old_value, value)
     
     def get_section(self, section: str) -> Dict[str, Any]:
         """Get entire configuration section"""
@@ -127,17 +261,32 @@ class ConfigManager:
     
     def set_section(self, section: str, values: Dict[str, Any]):
         """Set entire configuration section"""
-        self.config[section] = values
+        with self._lock:
+            old_values = self.config.get(section)
+            self.config[section] = values
+        if old_values != values:
+            self._notify(section, old_values, values)
+    
+    def remove_section(self, section: str):
+        """Remove a section (e.g. one migrated elsewhere); returns its old values"""
+        with self._lock:
+            old_values = self.config.pop(section, None)
+        if old_values is not None:
+            self._notify(section, old_values, None)
+        return old_values
     
     def reset_to_defaults(self):
         """Reset configuration to defaults"""
-        self.config = self.DEFAULT_CONFIG.copy()
+        with self._lock:
+            old_config = self.config
+            self.config = copy.deepcopy(self.DEFAULT_CONFIG)
+        self._notify_sections(old_config, self.config)
         self.save_config()
     
     def reset_section(self, section: str):
         """Reset specific section to defaults"""
         if section in self.DEFAULT_CONFIG:
-            self.config[section] = self.DEFAULT_CONFIG[section].copy()
+            self.set_section(section, copy.deepcopy(self.DEFAULT_CONFIG[section]))
     
     def export_config(self, filepath: str):
         """Export configuration to file"""
@@ -175,7 +324,11 @@ class ConfigManager:
             ('youtube.max_results', 1, 50),
             ('checker.max_workers', 1, 20),
             ('checker.timeout', 5, 60),
-            ('thumbnails.max_cache_size', 10, 1000)
+            ('thumbnails.memory_cache_mb', 8, 1024),
+            ('thumbnails.download_workers', 1, 16),
+            ('thumbnails.disk_cache_mb', 16, 10240),
+            ('thumbnails.max_age_days', 1, 365),
+            ('thumbnails.maintenance_interval_minutes', 1, 1440)
         ]
         
         for key, min_val, max_val in numeric_checks:
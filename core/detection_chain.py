@@ -0,0 +1,130 @@
+"""
+4K detection strategy chain
+Runs detectors cheapest-first, ordering them by cost learned at runtime
+"""
+import time
+import threading
+
+class DetectionStrategy:
+    """A detector plus the runtime stats used to rank it"""
+
+    # Declared expectations count as this many observed attempts
+    PRIOR_WEIGHT = 5
+
+    def __init__(self, name, detect, expected_seconds, expected_bytes=0, expected_success=0.5):
+        self.name = name
+        self.detect = detect  # detect(video_id) -> True / False / None (undecided)
+        self.expected_seconds = expected_seconds
+        self.expected_bytes = expected_bytes
+        self.expected_success = expected_success
+        self.attempts = 0
+        self.decisive = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.total_bytes = 0
+
+    def record(self, seconds, nbytes, decisive, error=False):
+        self.attempts += 1
+        self.total_seconds += seconds
+        self.total_bytes += nbytes
+        if decisive:
+            self.decisive += 1
+        if error:
+            self.errors += 1
+
+    def mean_seconds(self):
+        weight = self.PRIOR_WEIGHT
+        return (self.expected_seconds * weight + self.total_seconds) / (weight + self.attempts)
+
+    def mean_bytes(self):
+        weight = self.PRIOR_WEIGHT
+        return (self.expected_bytes * weight + self.total_bytes) / (weight + self.attempts)
+
+    def success_rate(self):
+        weight = self.PRIOR_WEIGHT
+        return (self.expected_success * weight + self.decisive) / (weight + self.attempts)
+
+    def cost_per_verdict(self, bandwidth):
+        """Expected seconds (latency plus transfer at bandwidth) spent per decisive answer"""
+        cost = self.mean_seconds() + self.mean_bytes() / bandwidth
+        return cost / max(self.success_rate(), 0.01)
+
+    def describe(self, bandwidth):
+        return {
+            'attempts': self.attempts,
+            'decisive': self.decisive,
+            'errors': self.errors,
+            'avg_seconds': round(self.total_seconds / self.attempts, 3) if self.attempts else None,
+            'avg_bytes': int(self.total_bytes / self.attempts) if self.attempts else None,
+            'success_rate': round(self.decisive / self.attempts, 3) if self.attempts else None,
+            'cost_per_verdict': round(self.cost_per_verdict(bandwidth), 3)
+        }
+
+
+class DetectionChain:
+    """Registry of detectors tried in order of expected cost per decisive verdict"""
+
+    # Bandwidth used to turn bytes into seconds when ranking (shared by all workers)
+    BANDWIDTH_BYTES_PER_SECOND = 1024 * 1024
+
+    def __init__(self, byte_counter=None, passthrough_exceptions=()):
+        self._strategies = []
+        self._lock = threading.Lock()
+        # Callable returning bytes read so far on this thread (for per-call byte stats)
+        self._byte_counter = byte_counter or (lambda: 0)
+        # Exceptions that must abort the chain (e.g. a user stop) instead of counting as errors
+        self._passthrough = tuple(passthrough_exceptions)
+
+    def register(self, name, detect, expected_seconds, expected_bytes=0, expected_success=0.5):
+        with self._lock:
+            self._strategies.append(
+                DetectionStrategy(name, detect, expected_seconds, expected_bytes, expected_success)
+            )
+
+    def ordered(self):
+        """Strategies cheapest-first by learned cost per decisive verdict"""
+        with self._lock:
+            return sorted(self._strategies, key=lambda s: s.cost_per_verdict(self.BANDWIDTH_BYTES_PER_SECOND))
+
+    def run(self, video_id):
+        """Return (verdict, strategy name); verdict is None if no detector decided"""
+        for strategy in self.ordered():
+            start_bytes = self._byte_counter()
+            start = time.perf_counter()
+            error = False
+            try:
+                verdict = strategy.detect(video_id)
+            except self._passthrough:
+                raise
+            except Exception as e:
+                print(f"{strategy.name} detector error for {video_id}: {e}")
+                verdict = None
+                error = True
+            with self._lock:
+                strategy.record(
+                    time.perf_counter() - start,
+                    self._byte_counter() - start_bytes,
+                    verdict is not None,
+                    error
+                )
+            if verdict is not None:
+                return verdict, strategy.name
+        return None, None
+
+    def get_stats(self):
+        """Per-strategy counters, in current chain order"""
+        bandwidth = self.BANDWIDTH_BYTES_PER_SECOND
+        strategies = self.ordered()
+        with self._lock:
+            return {s.name: s.describe(bandwidth) for s in strategies}
+
+    def format_stats(self):
+        lines = []
+        for name, stats in self.get_stats().items():
+            if not stats['attempts']:
+                continue
+            lines.append(
+                f"{name}: {stats['decisive']}/{stats['attempts']} decisive, "
+                f"{stats['avg_seconds']}s, {stats['avg_bytes'] // 1024} KB avg"
+            )
+        return "; ".join(lines)
@@ -0,0 +1,136 @@
+"""
+Video search index
+In-memory token/prefix index over loaded video titles and channels
+"""
+import re
+import bisect
+import threading
+
+class VideoSearchIndex:
+    """Incremental token/prefix index keyed by tree item ID"""
+
+    TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+    def __init__(self):
+        self._postings = {}      # token -> set of item IDs
+        self._tokens = []        # Sorted distinct tokens for prefix range scans
+        self._item_tokens = {}   # item ID -> frozenset of its tokens
+        self._lock = threading.Lock()
+        # Last query and its result, reused when the user keeps typing
+        self._last_terms = None
+        self._last_result = None
+
+    @classmethod
+    def tokenize(cls, text):
+        """Split text into normalized (casefolded) tokens"""
+        if not text:
+            return []
+        return cls.TOKEN_PATTERN.findall(str(text).casefold())
+
+    def add(self, item_id, title='', channel=''):
+        """Index (or re-index) a row by its title and channel"""
+        tokens = frozenset(self.tokenize(title) + self.tokenize(channel))
+        with self._lock:
+            if item_id in self._item_tokens:
+                self._remove_locked(item_id)
+            self._item_tokens[item_id] = tokens
+            for token in tokens:
+                posting = self._postings.get(token)
+                if posting is None:
+                    self._postings[token] = {item_id}
+                    bisect.insort(self._tokens, token)
+                else:
+                    posting.add(item_id)
+            self._invalidate_locked()
+
+    def remove(self, item_id):
+        """Drop a row from the index"""
+        with self._lock:
+            self._remove_locked(item_id)
+            self._invalidate_locked()
+
+    def clear(self):
+        """Drop every row from the index"""
+        with self._lock:
+            self._postings.clear()
+            self._tokens.clear()
+            self._item_tokens.clear()
+            self._invalidate_locked()
+
+    def _remove_locked(self, item_id):
+        tokens = self._item_tokens.pop(item_id, None)
+        if not tokens:
+            return
+        for token in tokens:
+            posting = self._postings.get(token)
+            if posting is None:
+                continue
+            posting.discard(item_id)
+            if not posting:
+                del self._postings[token]
+                pos = bisect.bisect_left(self._tokens, token)
+                if pos < len(self._tokens) and self._tokens[pos] == token:
+                    del self._tokens[pos]
+
+    def _invalidate_locked(self):
+        self._last_terms = None
+        self._last_result = None
+
+    def _prefix_matches_locked(self, prefix):
+        """Union of postings for every token starting with prefix"""
+        start = bisect.bisect_left(self._tokens, prefix)
+        end = bisect.bisect_left(self._tokens, prefix + '\U0010ffff', start)
+        if end - start == 1:
+            return set(self._postings[self._tokens[start]])
+        result = set()
+        for token in self._tokens[start:end]:
+            result.update(self._postings[token])
+        return result
+
+    def search(self, query):
+        """
+        Return the set of item IDs matching every term of query as a prefix
+        of a title/channel token, or None when the query is empty (no filter)
+        """
+        terms = self.tokenize(query)
+        if not terms:
+            return None
+
+        with self._lock:
+            previous_terms, previous = self._last_terms, self._last_result
+            if previous_terms is not None and self._narrows(previous_terms, terms):
+                # Typing extended the last query: only previous hits can still
+                # match, so intersect them with the terms that actually changed
+                changed = terms[len(previous_terms):] + [
+                    new for old, new in zip(previous_terms, terms) if new != old
+                ]
+                result = set(previous)
+                for term in changed:
+                    if not result:
+                        break
+                    result &= self._prefix_matches_locked(term)
+            else:
+                # Start from the rarest term to keep intersections small
+                candidates = sorted(
+                    (self._prefix_matches_locked(term) for term in terms),
+                    key=len
+                )
+                result = candidates[0]
+                for other in candidates[1:]:
+                    if not result:
+                        break
+                    result &= other
+
+            self._last_terms = terms
+            self._last_result = result
+            return set(result)
+
+    @staticmethod
+    def _narrows(previous_terms, terms):
+        """True when every previous term is extended by the term at the same position"""
+        if len(terms) < len(previous_terms):
+            return False
+        return all(new.startswith(old) for old, new in zip(previous_terms, terms))
+
+    def __len__(self):
+        return len(self._item_tokens)
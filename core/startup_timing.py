@@ -0,0 +1,57 @@
+"""
+Startup timing
+Records module import times and startup milestones (e.g. first paint)
+For a full interpreter-level breakdown run: python -X importtime main_app.py
+"""
+import sys
+import time
+import threading
+import importlib
+import importlib.util
+
+class StartupTimer:
+    """Milestones are measured from process start (first import of this module)"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self._lock = threading.Lock()
+        self.imports = {}     # module name -> seconds spent on first import
+        self.milestones = []  # (label, seconds since start)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started_at
+
+    def mark(self, label):
+        """Record a milestone such as 'window created' or 'first paint'"""
+        with self._lock:
+            self.milestones.append((label, self.elapsed()))
+
+    def import_module(self, name, package=None):
+        """importlib.import_module that records the cost of the first import"""
+        module_key = importlib.util.resolve_name(name, package) if name.startswith('.') else name
+        with self._lock:
+            seen = module_key in self.imports or module_key in sys.modules
+        start = time.perf_counter()
+        module = importlib.import_module(name, package)
+        if not seen:
+            with self._lock:
+                self.imports.setdefault(module_key, time.perf_counter() - start)
+        return module
+
+    def report(self):
+        """Human-readable milestones plus the slowest imports"""
+        with self._lock:
+            milestones = list(self.milestones)
+            imports = sorted(self.imports.items(), key=lambda kv: kv[1], reverse=True)
+        lines = ["⏱️ Startup timing:"]
+        for label, seconds in milestones:
+            lines.append(f"  {label:<24} {seconds * 1000:8.1f} ms")
+        if imports:
+            lines.append("  Imports (first load):")
+            for name, seconds in imports:
+                lines.append(f"    {name:<40} {seconds * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+
+# Shared by the lazy package loaders and the app
+startup_timer = StartupTimer()
@@ -0,0 +1,171 @@
+"""
+Thumbnail loading pipeline
+Bounded worker pool with prioritized, cancellable, de-duplicated requests
+"""
+import itertools
+import queue
+import threading
+
+class ThumbnailLoader:
+    """Loads thumbnails through a fixed-size worker pool instead of thread-per-row"""
+
+    # Lower value = served first
+    PRIORITY_VISIBLE = 0
+    PRIORITY_DEFAULT = 100
+
+    def __init__(self, thumbnail_manager, max_workers=4, size=(120, 68)):
+        self.thumbnail_manager = thumbnail_manager
+        self.max_workers = max(1, int(max_workers or 1))
+        self.size = tuple(size)
+        self._queue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._pending = {}         # key -> request dict (queued, not yet started)
+        self._running = {}         # key -> request dict (being loaded)
+        self._inflight_videos = {}  # video_id -> keys waiting on the same download
+        self._workers = []
+        self._shutdown = False
+
+    def _ensure_workers(self):
+        """Start worker threads on first use"""
+        if self._workers:
+            return
+        for i in range(self.max_workers):
+            worker = threading.Thread(
+                target=self._worker_loop,
+                name=f"thumbnail-worker-{i}",
+                daemon=True
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def request(self, key, video_id, thumbnail_url, callback, priority=None):
+        """
+        Queue a thumbnail load for key (a tree item ID)
+        Repeat requests for a queued key only update its priority/callback.
+        callback(key, photo) runs on a worker thread; photo is None if the load
+        failed, so the caller can forget the request and ask again later.
+        """
+        if not key or not video_id or not thumbnail_url:
+            return False
+        priority = self.PRIORITY_DEFAULT if priority is None else priority
+
+        with self._lock:
+            if self._shutdown:
+                return False
+            self._ensure_workers()
+
+            if key in self._running:
+                # Already loading; just make sure the latest callback is used
+                self._running[key]['callback'] = callback
+                return True
+
+            existing = self._pending.get(key)
+            if existing is not None:
+                existing['callback'] = callback
+                if priority < existing['priority']:
+                    self._push_locked(key, existing, priority)
+                return True
+
+            entry = {
+                'video_id': video_id,
+                'url': thumbnail_url,
+                'callback': callback,
+                'priority': priority,
+                'token': None
+            }
+            self._pending[key] = entry
+            self._push_locked(key, entry, priority)
+            return True
+
+    def _push_locked(self, key, entry, priority):
+        # Re-pushing invalidates older heap entries via the token check
+        token = next(self._seq)
+        entry['priority'] = priority
+        entry['token'] = token
+        self._queue.put((priority, token, key))
+
+    def prioritize(self, keys, priority=None):
+        """Move already-queued keys (e.g. rows now on screen) to the front"""
+        priority = self.PRIORITY_VISIBLE if priority is None else priority
+        with self._lock:
+            for key in keys:
+                entry = self._pending.get(key)
+                if entry is not None and priority < entry['priority']:
+                    self._push_locked(key, entry, priority)
+
+    def cancel(self, key):
+        """Forget a queued or running request; its callback will not fire"""
+        with self._lock:
+            self._pending.pop(key, None)
+            self._running.pop(key, None)
+
+    def cancel_all(self):
+        """Forget every queued and running request"""
+        with self._lock:
+            self._pending.clear()
+            self._running.clear()
+            self._inflight_videos.clear()
+
+    def shutdown(self):
+        """Stop workers after their current item"""
+        with self._lock:
+            self._shutdown = True
+            self._pending.clear()
+            self._running.clear()
+            self._inflight_videos.clear()
+        for _ in self._workers:
+            self._queue.put((-1, -1, None))
+
+    def get_stats(self):
+        """Queue and worker counters"""
+        with self._lock:
+            return {
+                'workers': len(self._workers),
+                'queued': len(self._pending),
+                'running': len(self._running)
+            }
+
+    def _worker_loop(self):
+        while True:
+            _, token, key = self._queue.get()
+            if key is None:
+                return
+
+            with self._lock:
+                if self._shutdown:
+                    return
+                entry = self._pending.get(key)
+                if entry is None or entry['token'] != token:
+                    continue  # Cancelled or superseded by a re-prioritized copy
+                del self._pending[key]
+                self._running[key] = entry
+                video_id = entry['video_id']
+                waiters = self._inflight_videos.get(video_id)
+                if waiters is not None:
+                    # Same video already downloading for another row: piggyback
+                    waiters.append(key)
+                    continue
+                self._inflight_videos[video_id] = [key]
+
+            photo = None
+            try:
+                photo = self.thumbnail_manager.get_thumbnail_image(
+                    video_id, entry['url'], self.size
+                )
+            except Exception as e:
+                print(f"Error loading thumbnail for {video_id}: {e}")
+
+            with self._lock:
+                waiting_keys = self._inflight_videos.pop(video_id, [key])
+                deliveries = []
+                for waiting_key in waiting_keys:
+                    running = self._running.pop(waiting_key, None)
+                    if running is not None:
+                        deliveries.append((waiting_key, running['callback']))
+
+            for waiting_key, callback in deliveries:
+                try:
+                    callback(waiting_key, photo)
+                except Exception as e:
+                    print(f"Error delivering thumbnail for {video_id}: {e}")
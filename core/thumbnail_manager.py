@@ -3,131 +3,281 @@ Thumbnail management service
 Handles downloading, caching and processing of video thumbnails
 """
 import os
-import requests
 import threading
-from PIL import Image, ImageTk
+import tkinter as tk
+from collections import OrderedDict
 from io import BytesIO
+from email.utils import formatdate
 import time
+from .thumbnail_store import ThumbnailPackStore
 
 class ThumbnailManager:
     """Service for managing video thumbnails"""
     
-    def __init__(self, cache_dir="thumbnails", max_cache_size=100, use_disk_cache=True):
+    # Tk keeps decoded photos as 32-bit pixels
+    BYTES_PER_PIXEL = 4
+    # Let startup traffic settle before the first disk maintenance pass
+    MAINTENANCE_START_DELAY = 30
+    
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    
+    def __init__(self, cache_dir="thumbnails", max_cache_bytes=64 * 1024 * 1024, use_disk_cache=True,
+                 max_disk_bytes=256 * 1024 * 1024, max_age_days=30, maintenance_interval=600,
+                 revalidate_after=7 * 86400):
         self.cache_dir = cache_dir
-        self.max_cache_size = max_cache_size
+        self.max_cache_bytes = max_cache_bytes
         self.use_disk_cache = use_disk_cache
-        self.thumbnail_cache = {}
+        # Disk policy: byte cap (LRU by access), age expiry, periodic maintenance
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age_seconds = max_age_days * 86400 if max_age_days else None
+        self.maintenance_interval = maintenance_interval
+        self._maintenance_thread = None
+        self._maintenance_stop = threading.Event()
+        # Cached sources older than this are revalidated with a conditional GET
+        self.revalidate_after = revalidate_after
+        self._display_sizes = set()
+        # One pooled session for all thumbnail traffic (created on first download)
+        self._session = None
+        self._session_lock = threading.Lock()
+        # LRU of decoded images: (video_id, (w, h)) -> (photo, size_in_bytes)
+        self.thumbnail_cache = OrderedDict()
+        self.cache_bytes = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
         self.cache_lock = threading.Lock()
+        # Packed disk store (one data file + index instead of a JPEG per video)
+        self.store = None
         if self.use_disk_cache:
             self._ensure_cache_dir()
+            self.store = ThumbnailPackStore(self.cache_dir)
+            self._migrate_legacy_files()
     
     def _ensure_cache_dir(self):
         """Ensure thumbnail cache directory exists"""
         if self.use_disk_cache and not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir)
     
-    def get_cache_path(self, video_id):
-        """Get cache file path for video thumbnail"""
-        return os.path.join(self.cache_dir, f"{video_id}.jpg")
+    def _migrate_legacy_files(self):
+        """Move per-video <video_id>.jpg files from older versions into the pack"""
+        try:
+            migrated = 0
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not entry.name.endswith('.jpg'):
+                        continue
+                    video_id = entry.name[:-len('.jpg')]
+                    if not self.store.contains(video_id):
+                        with open(entry.path, 'rb') as f:
+                            self.store.put(video_id, f.read())
+                    os.remove(entry.path)
+                    migrated += 1
+            if migrated:
+                print(f"Migrated {migrated} cached thumbnails into pack store")
+        except Exception as e:
+            print(f"Error migrating legacy thumbnail files: {e}")
+    
+    @property
+    def session(self):
+        """Shared requests session; requests is imported here, not at startup"""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    import requests
+                    session = requests.Session()
+                    session.headers['User-Agent'] = self.USER_AGENT
+                    self._session = session
+        return self._session
     
     def download_thumbnail(self, video_id, thumbnail_url):
-        """Download thumbnail image for video"""
+        """
+        Return thumbnail image bytes for video
+        Disk mode serves the pack store and revalidates stale entries with a
+        conditional GET (304 = keep cached bytes); memory mode fetches once.
+        """
+        import requests
         try:
             if not self.use_disk_cache:
-                # In memory mode: nothing to persist, just indicate success
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                _ = requests.get(thumbnail_url, headers=headers, timeout=10)
-                return None
-
-            cache_path = self.get_cache_path(video_id)
+                # In memory mode: nothing to persist, hand the bytes to the caller
+                response = self.session.get(thumbnail_url, timeout=10)
+                return response.content if response.status_code == 200 else None
 
             # Check if already cached
-            if os.path.exists(cache_path):
-                return cache_path
+            cached = self.store.get(video_id)
+            meta = self.store.get_meta(video_id) if cached is not None else None
+            if cached is not None and not self._revalidation_due(meta):
+                return cached
 
-            # Download thumbnail
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
+            # Download thumbnail (conditionally when we hold a cached copy)
+            headers = self._validator_headers(meta) if cached is not None else {}
+            try:
+                response = self.session.get(thumbnail_url, headers=headers, timeout=10)
+            except requests.RequestException as e:
+                if cached is not None:
+                    # Offline or flaky: a stale thumbnail beats none
+                    return cached
+                raise e
 
-            response = requests.get(thumbnail_url, headers=headers, timeout=10)
+            if response.status_code == 304 and cached is not None:
+                # Unchanged: no body transferred, just restart the freshness clock
+                self.store.update_meta(video_id, validated_at=time.time())
+                return cached
 
             if response.status_code == 200:
-                # Save to cache
-                with open(cache_path, 'wb') as f:
-                    f.write(response.content)
+                # Save to cache together with its validators
+                validators = {'validated_at': time.time()}
+                if response.headers.get('ETag'):
+                    validators['etag'] = response.headers['ETag']
+                if response.headers.get('Last-Modified'):
+                    validators['last_modified'] = response.headers['Last-Modified']
+                self.store.put(video_id, response.content, validators)
+                if cached is not None and cached != response.content:
+                    self._invalidate_display_tier(video_id)
 
-                return cache_path
+                return response.content
 
-            return None
+            return cached
 
         except Exception as e:
             print(f"Error downloading thumbnail for {video_id}: {e}")
             return None
     
+    def _revalidation_due(self, meta):
+        """True when a cached source image is older than the freshness window"""
+        if not meta or not self.revalidate_after:
+            return False
+        validated_at = meta.get('validated_at') or meta.get('stored_at') or 0
+        return time.time() - validated_at > self.revalidate_after
+    
+    @staticmethod
+    def _validator_headers(meta):
+        """Conditional request headers from stored validators"""
+        headers = {}
+        if not meta:
+            return headers
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+        elif meta.get('stored_at'):
+            # Entries migrated from plain files only know when they were written
+            headers['If-Modified-Since'] = formatdate(meta['stored_at'], usegmt=True)
+        return headers
+    
+    def _invalidate_display_tier(self, video_id):
+        """Drop pre-scaled copies after the source image changed"""
+        for size in list(self._display_sizes):
+            self.store.delete(self.get_display_key(video_id, size))
+        with self.cache_lock:
+            for key in [k for k in self.thumbnail_cache if k[0] == video_id]:
+                _, nbytes = self.thumbnail_cache.pop(key)
+                self.cache_bytes -= nbytes
+    
     def get_thumbnail_image(self, video_id, thumbnail_url, size=(120, 68)):
         """Get processed thumbnail image for display at 16:9 aspect ratio.
         Size should be a 16:9 tuple, e.g., (160, 90), (120, 68), etc.
         """
         try:
-            with self.cache_lock:
-                # Check memory cache first
-                cache_key = f"{video_id}_{size[0]}x{size[1]}"
-                if cache_key in self.thumbnail_cache:
-                    return self.thumbnail_cache[cache_key]
+            # Check memory cache first
+            cache_key = (video_id, tuple(size))
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
             
-            # Download or get from disk cache
+            target_w, target_h = size
             photo = None
-            if self.use_disk_cache:
-                cache_path = self.download_thumbnail(video_id, thumbnail_url)
-                if cache_path and os.path.exists(cache_path):
-                    image = Image.open(cache_path).convert('RGB')
-                else:
-                    image = None
-            else:
-                # Memory-only: fetch bytes and process directly
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                }
-                resp = requests.get(thumbnail_url, headers=headers, timeout=10)
-                image = Image.open(BytesIO(resp.content)).convert('RGB') if resp.status_code == 200 else None
+
+            # Display-ready tier: pre-scaled PPM that Tk loads without PIL decode/resize
+            display_key = self.get_display_key(video_id, size)
+            self._display_sizes.add(tuple(size))
+            if self.store is not None:
+                # Cheap conditional check first so a changed source invalidates this tier
+                if self._revalidation_due(self.store.get_meta(video_id)):
+                    self.download_thumbnail(video_id, thumbnail_url)
+                ready = self.store.get(display_key)
+                if ready is not None:
+                    try:
+                        photo = tk.PhotoImage(data=ready)
+                    except tk.TclError:
+                        # Unreadable entry: drop it and rebuild from the source image
+                        self.store.delete(display_key)
+                        photo = None
             
-            if image is not None:
-                target_w, target_h = size
-                # Create a black canvas of target size
-                canvas = Image.new('RGB', (target_w, target_h), (0, 0, 0))
-                # Compute scale to fit within 16:9 box while preserving aspect
-                scale = min(target_w / image.width, target_h / image.height)
-                new_w = max(1, int(image.width * scale))
-                new_h = max(1, int(image.height * scale))
-                resized = image.resize((new_w, new_h), Image.Resampling.LANCZOS)
-                # Paste centered
-                offset_x = (target_w - new_w) // 2
-                offset_y = (target_h - new_h) // 2
-                canvas.paste(resized, (offset_x, offset_y))
-                # Convert for Tkinter
-                photo = ImageTk.PhotoImage(canvas)
+            if photo is None:
+                # PIL is only needed when decoding; warm loads above never import it
+                from PIL import Image, ImageTk
+                # Download or get from disk cache (memory mode fetches exactly once)
+                data = self.download_thumbnail(video_id, thumbnail_url)
+                image = Image.open(BytesIO(data)).convert('RGB') if data else None
                 
-                # Cache in memory
-                with self.cache_lock:
-                    # Manage cache size
-                    if len(self.thumbnail_cache) >= self.max_cache_size:
-                        # Remove oldest entry
-                        oldest_key = next(iter(self.thumbnail_cache))
-                        del self.thumbnail_cache[oldest_key]
-                    
-                    self.thumbnail_cache[cache_key] = photo
+                if image is None:
+                    return None
                 
-                return photo
+                canvas = self._render_display_image(image, size)
+                # Persist the scaled result so warm loads skip this work
+                if self.store is not None:
+                    buffer = BytesIO()
+                    canvas.save(buffer, format='PPM')
+                    self.store.put(display_key, buffer.getvalue())
+                # Convert for Tkinter
+                photo = ImageTk.PhotoImage(canvas)
             
-            return None
+            # Cache in memory
+            self._cache_put(cache_key, photo, target_w * target_h * self.BYTES_PER_PIXEL)
+            
+            return photo
             
         except Exception as e:
             print(f"Error processing thumbnail for {video_id}: {e}")
             return None
     
+    @staticmethod
+    def get_display_key(video_id, size):
+        """Store key of the pre-scaled display image for a video and size"""
+        return f"{video_id}@{size[0]}x{size[1]}"
+    
+    def _render_display_image(self, image, size):
+        """Letterbox image onto a black canvas of the target size"""
+        from PIL import Image
+        target_w, target_h = size
+        # Create a black canvas of target size
+        canvas = Image.new('RGB', (target_w, target_h), (0, 0, 0))
+        # Compute scale to fit within 16:9 box while preserving aspect
+        scale = min(target_w / image.width, target_h / image.height)
+        new_w = max(1, int(image.width * scale))
+        new_h = max(1, int(image.height * scale))
+        resized = image.resize((new_w, new_h), Image.Resampling.LANCZOS)
+        # Paste centered
+        offset_x = (target_w - new_w) // 2
+        offset_y = (target_h - new_h) // 2
+        canvas.paste(resized, (offset_x, offset_y))
+        return canvas
+    
+    def _cache_get(self, cache_key):
+        """Return a cached photo and mark it most recently used"""
+        with self.cache_lock:
+            entry = self.thumbnail_cache.get(cache_key)
+            if entry is None:
+                self.cache_misses += 1
+                return None
+            self.thumbnail_cache.move_to_end(cache_key)
+            self.cache_hits += 1
+            return entry[0]
+    
+    def _cache_put(self, cache_key, photo, nbytes):
+        """Insert a photo, evicting least recently used entries over the byte budget"""
+        with self.cache_lock:
+            previous = self.thumbnail_cache.pop(cache_key, None)
+            if previous is not None:
+                self.cache_bytes -= previous[1]
+            self.thumbnail_cache[cache_key] = (photo, nbytes)
+            self.cache_bytes += nbytes
+            # Keep at least the newest entry even if it alone exceeds the budget
+            while self.cache_bytes > self.max_cache_bytes and len(self.thumbnail_cache) > 1:
+                _, (_, evicted_bytes) = self.thumbnail_cache.popitem(last=False)
+                self.cache_bytes -= evicted_bytes
+                self.cache_evictions += 1
+    
     def download_thumbnails_batch(self, videos, progress_callback=None):
         """Download thumbnails for multiple videos"""
         downloaded = 0
@@ -139,8 +289,7 @@ class ThumbnailManager:
                 thumbnail_url = video.get('thumbnail', '')
                 
                 if thumbnail_url:
-                    cache_path = self.download_thumbnail(video_id, thumbnail_url)
-                    if cache_path:
+                    if self.download_thumbnail(video_id, thumbnail_url):
                         downloaded += 1
                 
                 if progress_callback:
@@ -157,13 +306,11 @@ class ThumbnailManager:
             # Clear memory cache
             with self.cache_lock:
                 self.thumbnail_cache.clear()
+                self.cache_bytes = 0
             
             # Clear disk cache if enabled
-            if self.use_disk_cache and os.path.exists(self.cache_dir):
-                for filename in os.listdir(self.cache_dir):
-                    file_path = os.path.join(self.cache_dir, filename)
-                    if os.path.isfile(file_path):
-                        os.remove(file_path)
+            if self.store is not None:
+                self.store.clear()
             
             print("Thumbnail cache cleared")
             
@@ -172,25 +319,79 @@ class ThumbnailManager:
     
     def get_cache_stats(self):
         """Get cache statistics"""
-        memory_count = len(self.thumbnail_cache)
+        with self.cache_lock:
+            memory_count = len(self.thumbnail_cache)
+            memory_bytes = self.cache_bytes
+            hits = self.cache_hits
+            misses = self.cache_misses
+            evictions = self.cache_evictions
         
-        disk_count = 0
-        disk_size = 0
-        
-        if self.use_disk_cache and os.path.exists(self.cache_dir):
-            for filename in os.listdir(self.cache_dir):
-                file_path = os.path.join(self.cache_dir, filename)
-                if os.path.isfile(file_path):
-                    disk_count += 1
-                    disk_size += os.path.getsize(file_path)
+        # Disk numbers come straight from the pack index
+        disk = self.store.stats() if self.store is not None else {}
+        disk_count = disk.get('entries', 0)
+        disk_size = disk.get('file_bytes', 0)
         
+        lookups = hits + misses
         return {
             'memory_cached': memory_count,
+            'memory_size_mb': memory_bytes / (1024 * 1024),
+            'memory_budget_mb': self.max_cache_bytes / (1024 * 1024),
+            'memory_hits': hits,
+            'memory_misses': misses,
+            'memory_evictions': evictions,
+            'memory_hit_rate': (hits / lookups) if lookups else 0.0,
             'disk_cached': disk_count,
             'disk_size_mb': disk_size / (1024 * 1024),
+            'disk_reclaimable_mb': disk.get('dead_bytes', 0) / (1024 * 1024),
+            'disk_budget_mb': (self.max_disk_bytes or 0) / (1024 * 1024),
+            'disk_evictions': disk.get('evictions', 0),
             'cache_dir': self.cache_dir
         }
     
+    def run_disk_maintenance(self):
+        """Apply the disk policy once: expire, evict to the byte cap, compact"""
+        if self.store is None:
+            return 0
+        try:
+            removed = self.store.evict(max_bytes=self.max_disk_bytes, max_age=self.max_age_seconds)
+            self.store.flush_access_times()
+            # Reclaim space sooner than the write path would
+            self.store.maybe_compact(min_dead_ratio=0.25)
+            if removed:
+                print(f"Thumbnail cache maintenance: evicted {removed} entries")
+            return removed
+        except Exception as e:
+            print(f"Error in thumbnail cache maintenance: {e}")
+            return 0
+    
+    def start_maintenance(self):
+        """Run disk maintenance periodically on a background thread"""
+        if self.store is None or self._maintenance_thread is not None:
+            return None
+        
+        def maintenance_worker():
+            delay = self.MAINTENANCE_START_DELAY
+            while not self._maintenance_stop.wait(delay):
+                self.run_disk_maintenance()
+                delay = self.maintenance_interval
+        
+        self._maintenance_stop.clear()
+        self._maintenance_thread = threading.Thread(target=maintenance_worker, daemon=True)
+        self._maintenance_thread.start()
+        return self._maintenance_thread
+    
+    def close(self):
+        """Stop maintenance and flush/close the disk store"""
+        self._maintenance_stop.set()
+        self._maintenance_thread = None
+        if self.store is not None:
+            self.store.close()
+        if self._session is not None:
+            try:
+                self._session.close()
+            except Exception:
+                pass
+    
     def preload_thumbnails(self, videos, callback=None):
         """Preload thumbnails in background thread"""
         def preload_worker():
@@ -200,10 +401,7 @@ class ThumbnailManager:
                     thumbnail_url = video.get('thumbnail', '')
                     
                     if thumbnail_url:
-                        # Download thumbnail
-                        self.download_thumbnail(video_id, thumbnail_url)
-                        
-                        # Prepare display image
+                        # Download (if needed) and prepare display image
                         self.get_thumbnail_image(video_id, thumbnail_url)
                     
                     if callback:
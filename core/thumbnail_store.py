@@ -0,0 +1,359 @@
+"""
+Packed thumbnail disk store
+Append-only data file plus index log, memory-mapped reads and compaction
+"""
+import os
+import json
+import mmap
+import time
+import threading
+
+class ThumbnailPackStore:
+    """Stores many small blobs in one pack file instead of one file per video"""
+
+    DATA_FILE = 'thumbnails.pack'
+    INDEX_FILE = 'thumbnails.idx'
+    # Compact automatically once dead space is this large and outweighs live data
+    AUTO_COMPACT_MIN_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, cache_dir="thumbnails"):
+        self.cache_dir = cache_dir
+        self.data_path = os.path.join(cache_dir, self.DATA_FILE)
+        self.index_path = os.path.join(cache_dir, self.INDEX_FILE)
+        self._lock = threading.RLock()
+        self._index = {}        # key -> {'offset', 'length', 'stored_at', 'accessed_at', 'meta'}
+        self._live_bytes = 0
+        self._dirty_access = set()  # Keys whose access time is not yet in the index log
+        self.evictions = 0
+        self._data_size = 0
+        self._data_fh = None
+        self._index_fh = None
+        self._map = None
+        self._map_size = 0
+        self._open()
+
+    # --- Lifecycle ---------------------------------------------------------
+
+    def _open(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._data_fh = open(self.data_path, 'a+b')
+        self._data_fh.seek(0, os.SEEK_END)
+        self._data_size = self._data_fh.tell()
+        self._load_index()
+        self._index_fh = open(self.index_path, 'a', encoding='utf-8')
+
+    def _load_index(self):
+        """Replay the index log; later records win, torn tail lines are ignored"""
+        self._index = {}
+        self._live_bytes = 0
+        if not os.path.exists(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    key = record.get('k')
+                    if not key:
+                        continue
+                    if record.get('del'):
+                        self._drop_entry(key)
+                        continue
+                    offset, length = record.get('o', -1), record.get('n', -1)
+                    if offset < 0 or length < 0 or offset + length > self._data_size:
+                        continue  # Data never made it to disk
+                    self._drop_entry(key)
+                    stored_at = record.get('t', 0)
+                    self._index[key] = {
+                        'offset': offset,
+                        'length': length,
+                        'stored_at': stored_at,
+                        'accessed_at': record.get('a', stored_at),
+                        'meta': record.get('m') or {}
+                    }
+                    self._live_bytes += length
+        except Exception as e:
+            print(f"Error loading thumbnail index: {e}")
+
+    def _drop_entry(self, key):
+        self._dirty_access.discard(key)
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            self._live_bytes -= entry['length']
+        return entry
+
+    def close(self):
+        """Flush and release file handles"""
+        with self._lock:
+            self.flush_access_times()
+            self._close_map()
+            for fh in (self._index_fh, self._data_fh):
+                if fh is None:
+                    continue
+                try:
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                except Exception:
+                    pass
+                try:
+                    fh.close()
+                except Exception:
+                    pass
+            self._index_fh = None
+            self._data_fh = None
+
+    def _close_map(self):
+        if self._map is not None:
+            try:
+                self._map.close()
+            except Exception:
+                pass
+        self._map = None
+        self._map_size = 0
+
+    # --- Index log ---------------------------------------------------------
+
+    def _append_index(self, record):
+        self._index_fh.write(json.dumps(record, separators=(',', ':')) + '\n')
+        self._index_fh.flush()
+
+    def _index_record(self, key, entry):
+        record = {'k': key, 'o': entry['offset'], 'n': entry['length'], 't': entry['stored_at']}
+        if entry['accessed_at'] != entry['stored_at']:
+            record['a'] = entry['accessed_at']
+        if entry['meta']:
+            record['m'] = entry['meta']
+        return record
+
+    # --- Reads -------------------------------------------------------------
+
+    def _read(self, offset, length):
+        """Read a blob through the memory map, remapping after the file grew"""
+        if offset + length > self._map_size:
+            self._close_map()
+            self._data_fh.flush()
+            if self._data_size == 0:
+                return None
+            self._map = mmap.mmap(self._data_fh.fileno(), 0, access=mmap.ACCESS_READ)
+            self._map_size = len(self._map)
+            if offset + length > self._map_size:
+                return None
+        return self._map[offset:offset + length]
+
+    def get(self, key):
+        """Return stored bytes for key, or None"""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None or self._data_fh is None:
+                return None
+            # Access times feed LRU eviction; they are logged in batches
+            entry['accessed_at'] = time.time()
+            self._dirty_access.add(key)
+            try:
+                return self._read(entry['offset'], entry['length'])
+            except Exception as e:
+                print(f"Error reading thumbnail {key} from pack: {e}")
+                return None
+
+    def get_meta(self, key):
+        """Return a copy of the metadata stored with key, or None"""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None:
+                return None
+            return {**entry['meta'], 'stored_at': entry['stored_at'], 'length': entry['length']}
+
+    def contains(self, key):
+        with self._lock:
+            return key in self._index
+
+    def keys(self):
+        with self._lock:
+            return list(self._index.keys())
+
+    # --- Writes ------------------------------------------------------------
+
+    def put(self, key, data, meta=None):
+        """Append a blob and point key at it (replacing any previous blob)"""
+        if not key or data is None:
+            return False
+        with self._lock:
+            if self._data_fh is None:
+                return False
+            self._data_fh.seek(0, os.SEEK_END)
+            offset = self._data_fh.tell()
+            self._data_fh.write(data)
+            self._data_fh.flush()
+            self._data_size = offset + len(data)
+
+            self._drop_entry(key)
+            now = time.time()
+            entry = {
+                'offset': offset,
+                'length': len(data),
+                'stored_at': now,
+                'accessed_at': now,
+                'meta': dict(meta or {})
+            }
+            self._index[key] = entry
+            self._live_bytes += entry['length']
+            self._append_index(self._index_record(key, entry))
+        self.maybe_compact()
+        return True
+
+    def update_meta(self, key, **meta):
+        """Merge metadata into an existing entry without rewriting its blob"""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is None or self._index_fh is None:
+                return False
+            entry['meta'].update(meta)
+            self._append_index(self._index_record(key, entry))
+            return True
+
+    def delete(self, key):
+        """Drop key from the index; space is reclaimed by compaction"""
+        with self._lock:
+            if self._drop_entry(key) is None or self._index_fh is None:
+                return False
+            self._append_index({'k': key, 'del': True})
+            return True
+
+    def clear(self):
+        """Remove every blob and truncate both files"""
+        with self._lock:
+            self.close()
+            for path in (self.data_path, self.index_path):
+                try:
+                    if os.path.exists(path):
+                        os.remove(path)
+                except Exception as e:
+                    print(f"Error removing {path}: {e}")
+            self._index = {}
+            self._live_bytes = 0
+            self._dirty_access = set()
+            self._open()
+
+    def flush_access_times(self):
+        """Append one index record per entry read since the last flush"""
+        with self._lock:
+            if not self._dirty_access or self._index_fh is None:
+                return 0
+            count = 0
+            for key in self._dirty_access:
+                entry = self._index.get(key)
+                if entry is not None:
+                    self._append_index(self._index_record(key, entry))
+                    count += 1
+            self._dirty_access = set()
+            return count
+
+    # --- Eviction ----------------------------------------------------------
+
+    def evict(self, max_bytes=None, max_age=None, now=None):
+        """
+        Drop entries last validated (else stored) longer ago than max_age seconds,
+        then least recently accessed entries until live data fits in max_bytes.
+        Returns count removed.
+        """
+        now = time.time() if now is None else now
+        removed = 0
+        with self._lock:
+            if self._index_fh is None:
+                return 0
+            if max_age:
+                # A 304 revalidation only updates meta, so it counts as a fresh store
+                expired = [
+                    key for key, entry in self._index.items()
+                    if now - (entry['meta'].get('validated_at') or entry['stored_at']) > max_age
+                ]
+                for key in expired:
+                    self._drop_entry(key)
+                    self._append_index({'k': key, 'del': True})
+                removed += len(expired)
+            if max_bytes is not None and self._live_bytes > max_bytes:
+                by_access = sorted(self._index.items(), key=lambda kv: kv[1]['accessed_at'])
+                for key, _ in by_access:
+                    if self._live_bytes <= max_bytes:
+                        break
+                    self._drop_entry(key)
+                    self._append_index({'k': key, 'del': True})
+                    removed += 1
+            self.evictions += removed
+        return removed
+
+    # --- Compaction --------------------------------------------------------
+
+    def dead_bytes(self):
+        with self._lock:
+            return max(0, self._data_size - self._live_bytes)
+
+    def maybe_compact(self, min_dead_ratio=0.5):
+        """Compact when garbage is large and at least min_dead_ratio of the pack"""
+        with self._lock:
+            dead = max(0, self._data_size - self._live_bytes)
+            total = self._data_size
+        if dead >= self.AUTO_COMPACT_MIN_BYTES and total and dead / total >= min_dead_ratio:
+            return self.compact()
+        return False
+
+    def compact(self):
+        """Rewrite live blobs into a fresh pack and index, then swap atomically"""
+        with self._lock:
+            if self._data_fh is None:
+                return False
+            tmp_data = self.data_path + '.tmp'
+            tmp_index = self.index_path + '.tmp'
+            try:
+                with open(tmp_data, 'wb') as data_out, open(tmp_index, 'w', encoding='utf-8') as index_out:
+                    offset = 0
+                    for key, entry in self._index.items():
+                        blob = self._read(entry['offset'], entry['length'])
+                        if blob is None:
+                            continue
+                        data_out.write(blob)
+                        new_entry = {**entry, 'offset': offset}
+                        index_out.write(json.dumps(self._index_record(key, new_entry), separators=(',', ':')) + '\n')
+                        offset += len(blob)
+                    data_out.flush()
+                    os.fsync(data_out.fileno())
+                    index_out.flush()
+                    os.fsync(index_out.fileno())
+
+                # Access times are already part of the rewritten index
+                self._dirty_access = set()
+                # Handles must be closed before replacing (required on Windows)
+                self.close()
+                os.replace(tmp_data, self.data_path)
+                os.replace(tmp_index, self.index_path)
+                self._open()
+                return True
+            except Exception as e:
+                print(f"Error compacting thumbnail pack: {e}")
+                for path in (tmp_data, tmp_index):
+                    try:
+                        if os.path.exists(path):
+                            os.remove(path)
+                    except Exception:
+                        pass
+                if self._data_fh is None:
+                    self._open()
+                return False
+
+    # --- Stats -------------------------------------------------------------
+
+    def stats(self):
+        """Counters from the in-memory index (no directory walk)"""
+        with self._lock:
+            return {
+                'entries': len(self._index),
+                'live_bytes': self._live_bytes,
+                'file_bytes': self._data_size,
+                'dead_bytes': max(0, self._data_size - self._live_bytes),
+                'evictions': self.evictions
+            }
+
+    def __len__(self):
+        return len(self._index)
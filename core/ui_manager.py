@@ -5,11 +5,15 @@ Handles UI state synchronization and thread-safe updates
 import tkinter as tk
 from tkinter import ttk
 import threading
+import time
 from datetime import datetime
 
 class UIManager:
     """Manages UI state and provides thread-safe update methods"""
     
+    # Seconds between cancellation checks while waiting in run_on_ui_thread
+    UI_CALL_POLL = 0.1
+    
     def __init__(self, root):
         self.root = root
         self.ui_lock = threading.Lock()
@@ -40,6 +44,49 @@ class UIManager:
                 print(f"UI update error: {e}")
         
         self.root.after(0, wrapper)
+
+    def run_on_ui_thread(self, func, *args, timeout=None, cancel_token=None, **kwargs):
+        """
+        Run func on the main thread and return its result (blocks the caller)
+        Not wrapped in ui_lock: func may open dialogs that pump other updates.
+        If func has not started within timeout seconds, or cancel_token is
+        cancelled first, the call is withdrawn (func never runs) and None is
+        returned; once started it is always waited for.
+        """
+        if threading.current_thread() is threading.main_thread():
+            return func(*args, **kwargs)
+
+        done = threading.Event()
+        lock = threading.Lock()
+        outcome = {}
+
+        def wrapper():
+            with lock:
+                if outcome.get('withdrawn'):
+                    return
+                outcome['started'] = True
+            try:
+                outcome['result'] = func(*args, **kwargs)
+            except Exception as e:
+                print(f"UI call error: {e}")
+            finally:
+                done.set()
+
+        self.root.after(0, wrapper)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not done.wait(self.UI_CALL_POLL):
+            gave_up = (cancel_token is not None and cancel_token.is_cancelled) or (
+                deadline is not None and time.monotonic() >= deadline)
+            if not gave_up:
+                continue
+            with lock:
+                if not outcome.get('started'):
+                    outcome['withdrawn'] = True
+                    return None
+            # Already running on the main thread: let it finish
+            done.wait()
+            break
+        return outcome.get('result')
     
     def update_status(self, message, color=None):
         """Update status bar message"""
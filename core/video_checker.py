@@ -2,123 +2,239 @@
 4K video quality checking service
 Handles 4K availability detection for YouTube videos
 """
-import requests
-import urllib3
+import json
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from .detection_chain import DetectionChain
+
+_requests = None
+
+def _get_requests():
+    """Import requests on first check instead of at startup"""
+    global _requests
+    if _requests is None:
+        import requests
+        import urllib3
+        # SSL uyarılarını devre dışı bırak
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+        _requests = requests
+    return _requests
+
+class CheckStopped(Exception):
+    """Raised inside a check when stop_checking() aborted its request"""
+
+
+class CheckUndecided(Exception):
+    """Raised when no detector could give a verdict (network errors, block pages)"""
 
-# SSL uyarılarını devre dışı bırak
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 class Video4KChecker:
     """Service for checking 4K availability of YouTube videos"""
     
+    USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    # How often the coordinator looks at the stop flag while waiting on workers
+    POLL_INTERVAL = 0.1
+    CHUNK_SIZE = 64 * 1024
+    # Seconds without any finished video before the rest are reported as timed out
+    SCAN_TIMEOUT = 120
+    # Videos queued per worker; the rest wait in the input list, not as futures
+    QUEUE_DEPTH = 4
+    
+    # InnerTube player endpoint: a few KB of JSON instead of the ~1 MB watch page
+    INNERTUBE_PLAYER_URL = 'https://www.youtube.com/youtubei/v1/player?prettyPrint=false'
+    INNERTUBE_CLIENT = {'clientName': 'WEB', 'clientVersion': '2.20240726.00.00', 'hl': 'en'}
+    UHD_HEIGHT = 2160
+    
     def __init__(self):
         self.found_4k_videos = []
-        self.stop_requested = False
+        self._stop_event = threading.Event()
+        # Per-worker sessions and in-flight responses, closed on stop to abort I/O
+        self._local = threading.local()
+        self._io_lock = threading.Lock()
+        self._sessions = set()
+        self._responses = set()
+        # Detectors are ranked by measured cost per decisive verdict, not a fixed order
+        self.detection_chain = DetectionChain(
+            byte_counter=lambda: getattr(self._local, 'bytes_read', 0),
+            passthrough_exceptions=(CheckStopped,)
+        )
+        self.detection_chain.register('innertube', self._innertube_4k_check,
+                                      expected_seconds=0.4, expected_bytes=16 * 1024, expected_success=0.9)
+        self.detection_chain.register('video_info', self._advanced_4k_check,
+                                      expected_seconds=0.5, expected_bytes=4 * 1024, expected_success=0.2)
+        self.detection_chain.register('watch_page', self._simple_4k_check,
+                                      expected_seconds=1.5, expected_bytes=1024 * 1024, expected_success=0.9)
     
-    def check_4k_availability(self, video_url):
-        """Check if a video has 4K quality available"""
+    def get_detection_stats(self):
+        """Which detectors answered, with latency, bytes and success rate"""
+        return self.detection_chain.get_stats()
+    
+    @property
+    def stop_requested(self):
+        return self._stop_event.is_set()
+    
+    def _get_session(self):
+        """This worker's pooled session (connections are reused across videos)"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = _get_requests().Session()
+            session.headers['User-Agent'] = self.USER_AGENT
+            session.verify = False
+            self._local.session = session
+            with self._io_lock:
+                self._sessions.add(session)
+        return session
+    
+    def _fetch_text(self, method, url, timeout, **kwargs):
+        """
+        Return (status_code, body text) streaming the body in chunks so that
+        stop_checking() can abort mid-transfer; raises CheckStopped when stopped
+        """
+        if self._stop_event.is_set():
+            raise CheckStopped()
+        response = self._get_session().request(method, url, timeout=timeout, stream=True, **kwargs)
+        with self._io_lock:
+            self._responses.add(response)
         try:
-            # Extract video ID
-            video_id = None
-            if 'watch?v=' in video_url:
-                video_id = video_url.split('watch?v=')[1].split('&')[0]
-            elif 'youtu.be/' in video_url:
-                video_id = video_url.split('youtu.be/')[1].split('?')[0]
-            
-            if not video_id:
-                return False
-            
-            # Try different methods for 4K detection
+            if self._stop_event.is_set():
+                raise CheckStopped()
+            chunks = []
+            for chunk in response.iter_content(self.CHUNK_SIZE):
+                if self._stop_event.is_set():
+                    raise CheckStopped()
+                chunks.append(chunk)
+                self._local.bytes_read = getattr(self._local, 'bytes_read', 0) + len(chunk)
+            encoding = response.encoding or 'utf-8'
+            return response.status_code, b''.join(chunks).decode(encoding, errors='replace')
+        except CheckStopped:
+            raise
+        except Exception:
+            if self._stop_event.is_set():
+                raise CheckStopped()  # Connection closed under us by stop_checking
+            raise
+        finally:
+            with self._io_lock:
+                self._responses.discard(response)
+            response.close()
+    
+    def _abort_io(self):
+        """Close in-flight responses and pooled connections of every worker"""
+        with self._io_lock:
+            responses = list(self._responses)
+            sessions = list(self._sessions)
+            self._responses.clear()
+            self._sessions.clear()
+        for response in responses:
             try:
-                # Method 1: Check via yt-dlp style format detection
-                result = self._advanced_4k_check(video_id)
-                if result is not None:
-                    return result
-            except:
+                response.close()
+            except Exception:
                 pass
-            
-            # Method 2: Simple page-based check
-            return self._simple_4k_check(video_id)
-            
-        except Exception as e:
-            print(f"4K check error for {video_url}: {e}")
-            return False
+        for session in sessions:
+            try:
+                session.close()
+            except Exception:
+                pass
+    
+    def check_4k_availability(self, video_url):
+        """
+        Check if a video has 4K quality available
+        Raises CheckUndecided instead of answering False when nothing could tell.
+        """
+        # Extract video ID
+        video_id = None
+        if 'watch?v=' in video_url:
+            video_id = video_url.split('watch?v=')[1].split('&')[0]
+        elif 'youtu.be/' in video_url:
+            video_id = video_url.split('youtu.be/')[1].split('?')[0]
+        
+        if not video_id:
+            raise CheckUndecided(f"No video ID in {video_url}")
+        
+        # Cheapest detector first; undecided (None) falls through to the next
+        verdict, _ = self.detection_chain.run(video_id)
+        if verdict is None:
+            raise CheckUndecided(f"No detector could decide for {video_id}")
+        return verdict
+    
+    def _innertube_4k_check(self, video_id):
+        """
+        4K check from the player response's streamingData
+        Returns None when the endpoint gives no usable formats (chain falls through).
+        """
+        body = {
+            'context': {'client': self.INNERTUBE_CLIENT},
+            'videoId': video_id,
+            'contentCheckOk': True,
+            'racyCheckOk': True
+        }
+        status_code, content = self._fetch_text(
+            'POST', self.INNERTUBE_PLAYER_URL, timeout=5,
+            json=body, headers={'Content-Type': 'application/json'}
+        )
+        if status_code != 200:
+            return None
+        
+        player = json.loads(content)
+        if (player.get('playabilityStatus') or {}).get('status') != 'OK':
+            return None
+        streaming = player.get('streamingData') or {}
+        formats = (streaming.get('adaptiveFormats') or []) + (streaming.get('formats') or [])
+        if not formats:
+            return None
+        return any(self._format_height(f) >= self.UHD_HEIGHT for f in formats)
+    
+    @staticmethod
+    def _format_height(fmt):
+        """Resolution class of a format: '2160p60' -> 2160, else the shorter side"""
+        label = str(fmt.get('qualityLabel') or '')
+        digits = label.split('p', 1)[0]
+        if digits.isdigit():
+            return int(digits)
+        width, height = fmt.get('width') or 0, fmt.get('height') or 0
+        return min(width, height) if width and height else height
     
     def _advanced_4k_check(self, video_id):
-        """Advanced 4K format check using video info"""
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            # Check video info page
-            info_url = f"https://www.youtube.com/get_video_info?video_id={video_id}"
-            response = requests.get(info_url, headers=headers, timeout=10, verify=False)
-            
-            if response.status_code == 200:
-                content = response.text
-
-                # Look for 4K indicators in the response (precise markers only)
-                formats_data = content
-
-                # Known itags and explicit quality markers for 2160p (strict)
-                k4_indicators = [
-                    'itag=313',  # VP9 4K
-                    'itag=315',  # VP9 4K 60fps
-                    'itag=401',  # AV1 4K
-                    'itag=337',  # VP9 4K
-                    'height=2160',
-                    'quality=hd2160',
-                    'quality_label=2160p',
-                    '"qualityLabel":"2160p"'
-                ]
-
-                for indicator in k4_indicators:
-                    if indicator in formats_data:
-                        return True
-
-                # No reliable 4K markers found
-                return False
-                
-        except Exception as e:
-            print(f"Advanced 4K check error for {video_id}: {e}")
+        """Advanced 4K format check using the legacy video info endpoint"""
+        # Check video info page
+        info_url = f"https://www.youtube.com/get_video_info?video_id={video_id}"
+        status_code, content = self._fetch_text('GET', info_url, timeout=10)
+        if status_code != 200:
             return None
+        
+        # Known itags and explicit quality markers for 2160p (strict)
+        k4_indicators = [
+            'itag=313',  # VP9 4K
+            'itag=315',  # VP9 4K 60fps
+            'itag=401',  # AV1 4K
+            'itag=337',  # VP9 4K
+            'height=2160',
+            'quality=hd2160',
+            'quality_label=2160p',
+            '"qualityLabel":"2160p"'
+        ]
+        if any(indicator in content for indicator in k4_indicators):
+            return True
+        # No format data at all (e.g. an error payload) says nothing either way
+        return False if ('itag' in content or 'qualityLabel' in content) else None
     
     def _simple_4k_check(self, video_id):
         """Simple 4K check via video page"""
-        try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept-Language': 'en-US,en;q=0.9'
-            }
-            
-            url = f"https://www.youtube.com/watch?v={video_id}"
-            response = requests.get(url, headers=headers, timeout=5, verify=False)
-            
-            if response.status_code == 200:
-                content = response.text
-
-                # Only rely on structured quality markers, not free text like titles/descriptions
-                precise_markers = [
-                    '"qualityLabel":"2160p"',
-                    '"quality":"hd2160"',
-                    '"height":2160',
-                    'quality=hd2160'
-                ]
-
-                for marker in precise_markers:
-                    if marker in content:
-                        return True
-
-                return False
-            
-            return False
-            
-        except Exception as e:
-            print(f"Simple 4K check error for {video_id}: {e}")
-            return False
+        headers = {'Accept-Language': 'en-US,en;q=0.9'}
+        
+        url = f"https://www.youtube.com/watch?v={video_id}"
+        status_code, content = self._fetch_text('GET', url, timeout=5, headers=headers)
+        if status_code != 200:
+            return None
+        
+        # Only rely on structured quality markers, not free text like titles/descriptions
+        precise_markers = [
+            '"qualityLabel":"2160p"',
+            '"quality":"hd2160"',
+            '"height":2160',
+            'quality=hd2160'
+        ]
+        return any(marker in content for marker in precise_markers)
     
     def check_videos_parallel(self, video_details, progress_callback=None, status_callback=None, stop_check=None):
         """
@@ -131,7 +247,9 @@ class Video4KChecker:
             stop_check: Function that returns True if process should stop
         """
         self.found_4k_videos = []
-        self.stop_requested = False
+        self._stop_event.clear()
+        executor = None
+        future_to_video = {}
         
         try:
             # Filter HD videos for checking
@@ -153,29 +271,48 @@ class Video4KChecker:
             if status_callback:
                 status_callback(f"🚀 Smart 4K scanning with {max_workers} threads...")
             
-            with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Submit all videos for checking
-                future_to_video = {
-                    executor.submit(self.check_4k_availability, video['url']): video
-                    for video in hd_videos
-                }
+            # Not a with-block: leaving it would wait for every in-flight request
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='4k-check')
+            # Only a bounded window of videos is queued at a time (imports can be huge)
+            video_iter = iter(hd_videos)
+            
+            def submit_next():
+                for video in video_iter:
+                    future = executor.submit(self.check_4k_availability, video['url'])
+                    future_to_video[future] = video
+                    return future
+                return None
+            
+            for _ in range(max_workers * self.QUEUE_DEPTH):
+                if submit_next() is None:
+                    break
+            pending = set(future_to_video)
+            last_progress = time.monotonic()
+            
+            # Short waits so a stop request is seen within POLL_INTERVAL
+            while pending:
+                if (stop_check and stop_check()) or self._stop_event.is_set():
+                    self.stop_checking()
+                    break
+                remaining = last_progress + self.SCAN_TIMEOUT - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=min(self.POLL_INTERVAL, remaining),
+                                     return_when=FIRST_COMPLETED)
+                if done:
+                    last_progress = time.monotonic()
                 
-                # Process results as they complete
-                for future in as_completed(future_to_video, timeout=120):
-                    # Check if stop was requested
-                    if stop_check and stop_check():
-                        self.stop_requested = True
-                        # Cancel remaining futures
-                        for f in future_to_video:
-                            if not f.done():
-                                f.cancel()
+                for future in done:
+                    if self._stop_event.is_set():
                         break
-                    
-                    video = future_to_video[future]
+                    video = future_to_video.pop(future)
                     completed_count += 1
+                    next_future = submit_next()
+                    if next_future is not None:
+                        pending.add(next_future)
                     
                     try:
-                        is_4k = future.result(timeout=3)
+                        is_4k = future.result()
                         
                         if is_4k:
                             self.found_4k_videos.append(video['url'])
@@ -185,7 +322,10 @@ class Video4KChecker:
                             if progress_callback:
                                 progress_callback(video, "❌ No 4K")
                     
+                    except CheckStopped:
+                        break
                     except Exception as e:
+                        # Undecided or errored: never reported as "No 4K" (resume retries it)
                         print(f"Error checking video {video['id']}: {e}")
                         failed_count += 1
                         if progress_callback:
@@ -198,15 +338,17 @@ class Video4KChecker:
                             progress_text += f" [{failed_count} failed]"
                         status_callback(progress_text)
             
-            # Handle timeouts
+            # Handle timeouts (in-flight videos plus those never queued)
             remaining_videos = []
-            for future, video in future_to_video.items():
-                if not future.done() and not self.stop_requested:
-                    remaining_videos.append(video)
+            if not self.stop_requested:
+                for future in pending:
+                    remaining_videos.append(future_to_video[future])
+                remaining_videos.extend(video_iter)
+                for video in remaining_videos:
                     if progress_callback:
                         progress_callback(video, "⏰ Timeout")
             
-            if remaining_videos and not self.stop_requested and status_callback:
+            if remaining_videos and status_callback:
                 timeout_text = f"⚠️ {len(remaining_videos)} videos timed out"
                 status_callback(timeout_text)
             
@@ -221,8 +363,19 @@ class Video4KChecker:
             if status_callback:
                 status_callback(f"❌ 4K check error: {str(e)}")
         
+        finally:
+            stats_text = self.detection_chain.format_stats()
+            if stats_text:
+                print(f"📊 4K detection: {stats_text}")
+            if executor is not None:
+                # Drop queued videos now; running ones were aborted or finish in the background
+                executor.shutdown(wait=False, cancel_futures=True)
+            if not self.stop_requested:
+                self._abort_io()  # Scan over: release pooled connections
+        
         return self.found_4k_videos
     
     def stop_checking(self):
-        """Stop the current checking process"""
-        self.stop_requested = True
+        """Stop the current check: abort in-flight requests and skip queued videos"""
+        self._stop_event.set()
+        self._abort_io()
@@ -4,24 +4,97 @@ Handles YouTube API authentication and data fetching
 """
 import os
 import re
+import json
+import time
 import pickle
+import threading
 from dotenv import load_dotenv
-from googleapiclient.discovery import build
-from google_auth_oauthlib.flow import Flow, InstalledAppFlow
-from google.auth.transport.requests import Request
-import google.auth.exceptions
 import sys
 import glob
+from .app_paths import get_app_data_dir
+from .api_transport import ApiTransportPool
+from .startup_timing import startup_timer
 
 # Load environment variables
 load_dotenv()
 
+DISCOVERY_URL = 'https://www.googleapis.com/discovery/v1/apis/youtube/v3/rest'
+_discovery_lock = threading.Lock()
+_discovery_document = None
+
+def _load_discovery_document():
+    """
+    Parsed YouTube Data API v3 discovery document, loaded once per process
+    Order: copy bundled with google-api-python-client, app-data cache, one network fetch
+    """
+    global _discovery_document
+    with _discovery_lock:
+        if _discovery_document is not None:
+            return _discovery_document
+
+        text = None
+        try:
+            text = startup_timer.import_module('googleapiclient.discovery_cache').get_static_doc('youtube', 'v3')
+        except Exception as e:
+            print(f"Bundled discovery document unavailable: {e}")
+
+        # Frozen builds may not ship the library's data files; fall back to our own copy
+        cache_path = os.path.join(get_app_data_dir('discovery'), 'youtube.v3.json')
+        if not text and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    text = f.read()
+            except Exception as e:
+                print(f"Error reading cached discovery document: {e}")
+        if not text:
+            response = startup_timer.import_module('requests').get(DISCOVERY_URL, timeout=15)
+            response.raise_for_status()
+            text = response.text
+            try:
+                tmp_path = cache_path + '.tmp'
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(text)
+                os.replace(tmp_path, cache_path)
+            except Exception as e:
+                print(f"Error caching discovery document: {e}")
+
+        _discovery_document = json.loads(text)
+        return _discovery_document
+
+# Google client libraries take several hundred ms to import; load them on first use
+def _build_client(developerKey=None, credentials=None):
+    """
+    Build a youtube v3 client from the cached discovery document (no network)
+    Each thread executing its requests gets its own transport (see ApiTransportPool).
+    """
+    discovery = startup_timer.import_module('googleapiclient.discovery')
+    pool = ApiTransportPool(credentials)
+    return discovery.build_from_document(
+        _load_discovery_document(),
+        developerKey=developerKey,
+        http=pool.http(),
+        requestBuilder=pool.request_builder
+    )
+
+def _auth_request():
+    return startup_timer.import_module('google.auth.transport.requests').Request()
+
+def _oauth_flow_module():
+    return startup_timer.import_module('google_auth_oauthlib.flow')
+
 class YouTubeAPIService:
     """Handles YouTube API operations and authentication"""
 
-    def __init__(self):
-        self.youtube = None  # Active service (API key or OAuth)
+    # Titles, definition and thumbnails rarely change; counters do
+    DETAILS_TTL = 7 * 24 * 3600
+    STATISTICS_TTL = 3600
+    
+    def __init__(self, catalog=None):
+        self.youtube = None  # Active service (API key or OAuth), shared with PlaylistService
+        self._api_key_client = None
+        self._api_key_client_key = None
         self.credentials = None
+        self.catalog = catalog  # VideoCatalog used as the videos().list metadata cache
         self.api_key = os.getenv('YOUTUBE_API_KEY')
         # Compatibility fields expected by main_app
         self.client_secrets_file = 'client_secret.json'
@@ -89,21 +162,15 @@ class YouTubeAPIService:
                 continue
 
         # Resolve token storage path to a writable user directory
-        try:
-            base_dir = None
-            if os.name == 'nt':
-                base_dir = os.getenv('LOCALAPPDATA')
-                if not base_dir:
-                    base_dir = os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
-            else:
-                base_dir = os.path.join(os.path.expanduser('~'), '.config')
-            app_dir = os.path.join(base_dir, 'youtube_4k_checker') if base_dir else os.path.expanduser('~')
-            os.makedirs(app_dir, exist_ok=True)
-            self.token_file = os.path.join(app_dir, 'token.pickle')
-        except Exception:
-            # Fallback to current working directory
-            self.token_file = os.path.join(os.getcwd(), 'token.pickle')
+        self.token_file = os.path.join(get_app_data_dir(), 'token.pickle')
         
+    def _get_api_key_client(self):
+        """API-key client, rebuilt only when the key changes"""
+        if self._api_key_client is None or self._api_key_client_key != self.api_key:
+            self._api_key_client = _build_client(developerKey=self.api_key)
+            self._api_key_client_key = self.api_key
+        return self._api_key_client
+    
     def setup_youtube_api(self):
         """Initialize YouTube API service with retry mechanism"""
         try:
@@ -112,7 +179,7 @@ class YouTubeAPIService:
                 max_retries = 3
                 for attempt in range(max_retries):
                     try:
-                        self.youtube = build('youtube', 'v3', developerKey=self.api_key)
+                        self.youtube = self._get_api_key_client()
                         
                         # Test the API connection
                         test_request = self.youtube.search().list(
@@ -155,15 +222,15 @@ class YouTubeAPIService:
                     self.credentials = pickle.load(token)
                 
                 if self.credentials and self.credentials.valid:
-                    self.authenticated_youtube = build('youtube', 'v3', credentials=self.credentials)
+                    self.authenticated_youtube = _build_client(credentials=self.credentials)
                     self.youtube = self.authenticated_youtube
                     self.is_authenticated = True
                     return self.youtube
                 elif self.credentials and self.credentials.expired and self.credentials.refresh_token:
-                    self.credentials.refresh(Request())
+                    self.credentials.refresh(_auth_request())
                     with open(self.token_file, 'wb') as token:
                         pickle.dump(self.credentials, token)
-                    self.authenticated_youtube = build('youtube', 'v3', credentials=self.credentials)
+                    self.authenticated_youtube = _build_client(credentials=self.credentials)
                     self.youtube = self.authenticated_youtube
                     self.is_authenticated = True
                     return self.youtube
@@ -186,7 +253,7 @@ class YouTubeAPIService:
                 return False
             
             # OAuth 2.0 flow
-            flow = Flow.from_client_secrets_file(
+            flow = _oauth_flow_module().Flow.from_client_secrets_file(
                 self.client_secrets_file,
                 scopes=['https://www.googleapis.com/auth/youtube.readonly']
             )
@@ -213,7 +280,7 @@ class YouTubeAPIService:
                 self._resolve_paths()
             except Exception:
                 pass
-            flow = Flow.from_client_secrets_file(
+            flow = _oauth_flow_module().Flow.from_client_secrets_file(
                 self.client_secrets_file,
                 scopes=['https://www.googleapis.com/auth/youtube.readonly']
             )
@@ -227,7 +294,7 @@ class YouTubeAPIService:
                 pickle.dump(self.credentials, token)
             
             # Build service
-            self.authenticated_youtube = build('youtube', 'v3', credentials=self.credentials)
+            self.authenticated_youtube = _build_client(credentials=self.credentials)
             self.youtube = self.authenticated_youtube
             self.is_authenticated = True
             
@@ -256,7 +323,7 @@ class YouTubeAPIService:
                     callback("❌ client_secret.json not found! Place it next to the app or set CLIENT_SECRETS_FILE.")
                 return None
 
-            flow = InstalledAppFlow.from_client_secrets_file(
+            flow = _oauth_flow_module().InstalledAppFlow.from_client_secrets_file(
                 self.client_secrets_file,
                 scopes=['https://www.googleapis.com/auth/youtube.readonly']
             )
@@ -269,7 +336,7 @@ class YouTubeAPIService:
             except Exception:
                 pass
             # Build OAuth service
-            self.authenticated_youtube = build('youtube', 'v3', credentials=self.credentials)
+            self.authenticated_youtube = _build_client(credentials=self.credentials)
             self.youtube = self.authenticated_youtube
             self.is_authenticated = True
             if callback:
@@ -331,10 +398,10 @@ class YouTubeAPIService:
                     self.credentials = pickle.load(token)
                 if self.credentials and (self.credentials.valid or self.credentials.refresh_token):
                     if not self.credentials.valid:
-                        self.credentials.refresh(Request())
+                        self.credentials.refresh(_auth_request())
                         with open(self.token_file, 'wb') as token:
                             pickle.dump(self.credentials, token)
-                    self.authenticated_youtube = build('youtube', 'v3', credentials=self.credentials)
+                    self.authenticated_youtube = _build_client(credentials=self.credentials)
                     self.youtube = self.authenticated_youtube
                     self.is_authenticated = True
                     print("✅ Loaded existing OAuth credentials.")
@@ -390,8 +457,12 @@ class YouTubeAPIService:
         
         return video_ids
     
-    def get_video_details(self, video_ids, service=None):
-        """Get video details from video IDs with retry mechanism"""
+    def get_video_details(self, video_ids, service=None, include_statistics=False):
+        """
+        Get video details from video IDs with retry mechanism
+        Fresh entries come from the local catalog; only stale or missing IDs are fetched.
+        Statistics are not displayed anywhere, so they are only requested when asked for.
+        """
         video_details = {}
         svc = service or self.youtube
         
@@ -399,7 +470,21 @@ class YouTubeAPIService:
             print("❌ YouTube service is not initialized")
             return video_details
         
-        max_retries = 3
+        to_fetch = list(dict.fromkeys(video_ids))
+        stats_only = []
+        if self.catalog is not None:
+            try:
+                cached, to_fetch, stats_only = self.catalog.get_cached_details(
+                    to_fetch, self.DETAILS_TTL, self.STATISTICS_TTL if include_statistics else None
+                )
+                video_details.update(cached)
+                if cached:
+                    print(f"💾 {len(cached)} video(s) from cache, {len(to_fetch)} to fetch")
+            except Exception as e:
+                print(f"Error reading video cache: {e}")
+        
+        part = 'snippet,contentDetails,statistics' if include_statistics else 'snippet,contentDetails'
+        fetched = []
         
         def _is_english_code(code: str) -> bool:
             try:
@@ -410,7 +495,91 @@ class YouTubeAPIService:
             except Exception:
                 return False
 
-        # Process in batches of 50 (API limit)
+        def handle_item(item):
+            video_id = item['id']
+            snippet = item.get('snippet', {})
+            content_details = item.get('contentDetails', {})
+
+            default_audio_lang = snippet.get('defaultAudioLanguage')
+            default_lang = snippet.get('defaultLanguage')
+            is_english = _is_english_code(default_audio_lang) or _is_english_code(default_lang)
+            video_details[video_id] = {
+                'id': video_id,
+                'title': snippet.get('title', ''),
+                'url': f"https://www.youtube.com/watch?v={video_id}",
+                'definition': content_details.get('definition', 'hd'),
+                'dimension': content_details.get('dimension', '2d'),
+                'thumbnail': snippet.get('thumbnails', {}).get('medium', {}).get('url', ''),
+                'channel_title': snippet.get('channelTitle', ''),
+                'published_at': snippet.get('publishedAt', ''),
+                # Language signals from API
+                'default_audio_language': default_audio_lang or '',
+                'default_language': default_lang or '',
+                'is_english': is_english
+            }
+            if 'statistics' in item:
+                video_details[video_id]['statistics'] = self._parse_statistics(item['statistics'])
+            fetched.append(video_details[video_id])
+
+        def add_fallback(batch_ids):
+            # Add basic info for failed videos (flagged: never cached, never merged over known fields)
+            for video_id in batch_ids:
+                if video_id not in video_details:
+                    video_details[video_id] = {
+                        'id': video_id,
+                        'title': f'Video {video_id}',
+                        'url': f"https://www.youtube.com/watch?v={video_id}",
+                        'definition': 'hd',  # Default
+                        'dimension': '2d',
+                        'thumbnail': '',
+                        'channel_title': 'Unknown',
+                        'published_at': '',
+                        'default_audio_language': '',
+                        'default_language': '',
+                        'is_english': False,
+                        'details_unavailable': True
+                    }
+
+        fetched_at = time.time()
+        self._list_videos_batched(svc, to_fetch, part, handle_item, add_fallback)
+        
+        # Details still fresh, statistics expired: refresh only the statistics part
+        fresh_stats = {}
+        def handle_stats(item):
+            stats = self._parse_statistics(item.get('statistics', {}))
+            fresh_stats[item['id']] = stats
+            video_details[item['id']]['statistics'] = stats
+        self._list_videos_batched(svc, stats_only, 'statistics', handle_stats)
+        
+        if self.catalog is not None and (fetched or fresh_stats):
+            try:
+                self.catalog.upsert_videos(
+                    fetched, fetched_at=fetched_at,
+                    stats_fetched_at=fetched_at if include_statistics else None
+                )
+                self.catalog.update_video_statistics(fresh_stats, fetched_at=fetched_at)
+            except Exception as e:
+                print(f"Error updating video cache: {e}")
+        
+        return video_details
+    
+    @staticmethod
+    def _parse_statistics(statistics):
+        def as_int(value):
+            try:
+                return int(value)
+            except (TypeError, ValueError):
+                return None
+        return {
+            'view_count': as_int(statistics.get('viewCount')),
+            'like_count': as_int(statistics.get('likeCount')),
+            'comment_count': as_int(statistics.get('commentCount'))
+        }
+    
+    def _list_videos_batched(self, svc, video_ids, part, handle_item, on_failure=None):
+        """videos().list in batches of 50 (API limit), each retried up to 3 times"""
+        max_retries = 3
+        
         for i in range(0, len(video_ids), 50):
             batch_ids = video_ids[i:i+50]
             
@@ -418,65 +587,28 @@ class YouTubeAPIService:
             for attempt in range(max_retries):
                 try:
                     request = svc.videos().list(
-                        part='snippet,contentDetails,statistics',
+                        part=part,
                         id=','.join(batch_ids)
                     )
                     response = request.execute()
                     
                     # Process response
                     for item in response['items']:
-                        video_id = item['id']
-                        snippet = item.get('snippet', {})
-                        content_details = item.get('contentDetails', {})
-
-                        default_audio_lang = snippet.get('defaultAudioLanguage')
-                        default_lang = snippet.get('defaultLanguage')
-                        is_english = _is_english_code(default_audio_lang) or _is_english_code(default_lang)
-                        video_details[video_id] = {
-                            'id': video_id,
-                            'title': snippet.get('title', ''),
-                            'url': f"https://www.youtube.com/watch?v={video_id}",
-                            'definition': content_details.get('definition', 'hd'),
-                            'dimension': content_details.get('dimension', '2d'),
-                            'thumbnail': snippet.get('thumbnails', {}).get('medium', {}).get('url', ''),
-                            'channel_title': snippet.get('channelTitle', ''),
-                            'published_at': snippet.get('publishedAt', ''),
-                            # Language signals from API
-                            'default_audio_language': default_audio_lang or '',
-                            'default_language': default_lang or '',
-                            'is_english': is_english
-                        }
+                        handle_item(item)
                     
-                    print(f"✅ Batch {i//50 + 1}: Got details for {len(response['items'])} videos")
+                    print(f"✅ Batch {i//50 + 1}: Got {part} for {len(response['items'])} videos")
                     break  # Success, exit retry loop
                     
                 except Exception as e:
                     print(f"❌ Batch {i//50 + 1} attempt {attempt + 1} failed: {e}")
                     
                     if attempt < max_retries - 1:
-                        import time
                         time.sleep(1 * (attempt + 1))  # Exponential backoff
                         continue
                     else:
-                        print(f"❌ Failed to get details for batch {i//50 + 1} after {max_retries} attempts")
-                        # Add basic info for failed videos
-                        for video_id in batch_ids:
-                            if video_id not in video_details:
-                                video_details[video_id] = {
-                                    'id': video_id,
-                                    'title': f'Video {video_id}',
-                                    'url': f"https://www.youtube.com/watch?v={video_id}",
-                                    'definition': 'hd',  # Default
-                                    'dimension': '2d',
-                                    'thumbnail': '',
-                                    'channel_title': 'Unknown',
-                                    'published_at': '',
-                                    'default_audio_language': '',
-                                    'default_language': '',
-                                    'is_english': False
-                                }
-        
-        return video_details
+                        print(f"❌ Failed to get {part} for batch {i//50 + 1} after {max_retries} attempts")
+                        if on_failure:
+                            on_failure(batch_ids)
     
     def get_playlist_info(self, playlist_id, service=None):
         """Get playlist information"""
@@ -2,20 +2,24 @@
 Main modular application for YouTube 4K Checker
 Clean, organized, and maintainable version
 """
+# Imported first so startup timing starts as early as possible
+from core.startup_timing import startup_timer
 import tkinter as tk
 from tkinter import ttk
 import os
+import threading
 from dotenv import load_dotenv
 
-# Import modular components
+# Import modular components (heavy third-party libraries load on first use)
 from core import (
     ThemeConfig, YouTubeAPIService, Video4KChecker,
-    ThumbnailManager, UIManager, ConfigManager
+    ThumbnailManager, ThumbnailLoader, UIManager, ConfigManager, VideoCatalog
 )
 from ui import WidgetFactory, TreeManager
-from services import PlaylistService, VideoOperations
+from services import PlaylistService, VideoOperations, JobManager
 from services.event_handlers import EventHandlers
 from widgets.video_actions_widget import VideoActionsWidget
+startup_timer.mark('modules imported')
 
 class YouTube4KCheckerApp:
     """
@@ -31,7 +35,8 @@ class YouTube4KCheckerApp:
         self.load_env_config()
         
         # Initialize core services
-        self.config_manager = ConfigManager()
+        # Writes are debounced and atomic; flushed on exit
+        self.config_manager = ConfigManager(write_behind=True)
         self.theme_config = ThemeConfig()
         self.ui_manager = UIManager(root)
         # Configure thumbnails from config
@@ -42,24 +47,49 @@ class YouTube4KCheckerApp:
             pass
         self.thumbnail_manager = ThumbnailManager(
             cache_dir=thumb_cfg.get('cache_dir', 'thumbnails'),
-            max_cache_size=thumb_cfg.get('max_cache_size', 100),
-            use_disk_cache=thumb_cfg.get('use_disk_cache', True)
+            max_cache_bytes=int(thumb_cfg.get('memory_cache_mb', 64) * 1024 * 1024),
+            use_disk_cache=thumb_cfg.get('use_disk_cache', True),
+            max_disk_bytes=int(thumb_cfg.get('disk_cache_mb', 256) * 1024 * 1024),
+            max_age_days=thumb_cfg.get('max_age_days', 30),
+            maintenance_interval=thumb_cfg.get('maintenance_interval_minutes', 10) * 60,
+            revalidate_after=thumb_cfg.get('revalidate_after_hours', 168) * 3600
         )
-        self.youtube_service = YouTubeAPIService()
+        self.thumbnail_manager.start_maintenance()
+        # Local catalog of videos, playlists, 4K results and copy history
+        self.catalog = VideoCatalog()
+        self._migrate_copy_history()
+        self.youtube_service = YouTubeAPIService(catalog=self.catalog)
         self.video_checker = Video4KChecker()
         # Apply API key from config (UI-managed)
         try:
             self.youtube_service.api_key = self.config_manager.get('youtube.api_key', '')
         except Exception:
             pass
+        # Keep the service's key in sync with later config changes
+        self.config_manager.subscribe(
+            lambda key, old, new: setattr(self.youtube_service, 'api_key', new or ''),
+            'youtube.api_key'
+        )
         
         # Initialize UI services
         self.widget_factory = WidgetFactory(self.theme_config)
-        self.tree_manager = TreeManager(self.ui_manager, self.thumbnail_manager, self.theme_config)
+        self.thumbnail_loader = ThumbnailLoader(
+            self.thumbnail_manager,
+            max_workers=thumb_cfg.get('download_workers', 4)
+        )
+        self.tree_manager = TreeManager(
+            self.ui_manager, self.thumbnail_manager, self.theme_config,
+            thumbnail_loader=self.thumbnail_loader
+        )
         
         # Initialize business services
-        self.playlist_service = PlaylistService(self.youtube_service.youtube)
-        self.video_operations = VideoOperations(self.ui_manager, self.playlist_service, self.theme_config)
+        # Shares the API service's client (no second build per service)
+        self.playlist_service = PlaylistService(api_service=self.youtube_service)
+        # One scheduler for loads, checks, removals and info lookups
+        self.job_manager = JobManager()
+        self.video_operations = VideoOperations(
+            self.ui_manager, self.playlist_service, self.theme_config, jobs=self.job_manager
+        )
         # Wire references for cross-service helpers
         try:
             self.tree_manager.video_operations = self.video_operations
@@ -72,15 +102,30 @@ class YouTube4KCheckerApp:
         # Initialize event handlers
         self.event_handlers = EventHandlers(
             self.ui_manager, self.playlist_service, self.youtube_service,
-            self.video_checker, self.tree_manager
+            self.video_checker, self.tree_manager, jobs=self.job_manager
         )
+        if self.config_manager.get('advanced.debug_mode', False):
+            # Live job list in the console
+            self.job_manager.subscribe(
+                lambda jobs: print("🧵 Jobs: " + (", ".join(f"{j['name']} [{j['state']}]" for j in jobs) or "idle"))
+            )
         
         # Setup UI and theme
         self.setup_theme()
         self.create_ui()
         self.bind_events()
         
-        # Initialize authentication
+        startup_timer.mark('window built')
+        
+        # Authentication (network + Google client import) waits until the window has painted
+        self.root.after_idle(self._on_first_paint)
+    
+    def _on_first_paint(self):
+        """Runs once the main loop is idle, i.e. the first frame is on screen"""
+        startup_timer.mark('first paint')
+        # Last session's playlist from the catalog; refreshed once the API is ready
+        if self.event_handlers.restore_last_session():
+            startup_timer.mark('last session restored')
         self.setup_authentication()
     
     def setup_window(self):
@@ -159,6 +204,7 @@ class YouTube4KCheckerApp:
         # Playlist widgets
         self.ui_manager.register_element('url_entry', self.playlist_widgets['url_entry'])
         self.ui_manager.register_element('paste_button', self.playlist_widgets['paste_button'])
+        self.ui_manager.register_element('import_button', self.playlist_widgets['import_button'])
         self.ui_manager.register_element('info_label', self.playlist_widgets['info_label'])
 
         # Filter widgets
@@ -171,6 +217,8 @@ class YouTube4KCheckerApp:
             self.ui_manager.register_element('filter_4k_check', self.filter_widgets['filter_4k_check'])
         if 'filter_copied_check' in self.filter_widgets:
             self.ui_manager.register_element('filter_copied_check', self.filter_widgets['filter_copied_check'])
+        if 'search_entry' in self.filter_widgets:
+            self.ui_manager.register_element('search_entry', self.filter_widgets['search_entry'])
 
         # Main buttons
         self.ui_manager.register_element('check_button', self.main_button_widgets['check_button'])
@@ -200,9 +248,26 @@ class YouTube4KCheckerApp:
         self.ui_manager.register_element('theme', self.theme_config)
         # Expose config manager for components that read/write persistent settings
         self.ui_manager.register_element('config_manager', self.config_manager)
+        # Expose the local catalog (copy history, 4K results, playlist membership)
+        self.ui_manager.register_element('catalog', self.catalog)
+        # Expose the job scheduler (live job list, cancellation)
+        self.ui_manager.register_element('job_manager', self.job_manager)
         # Expose youtube service for checking OAuth vs API key where needed
         self.ui_manager.register_element('youtube_service', self.youtube_service)
     
+    def _migrate_copy_history(self):
+        """Move copy history from config.json into the catalog (one-time)"""
+        try:
+            copied = self.config_manager.get('history.copied_video_ids', None)
+            if copied is None:
+                return
+            added = self.catalog.mark_copied(copied)
+            self.config_manager.remove_section('history')
+            self.config_manager.save_config()
+            print(f"📦 Migrated {added} copied video(s) from config to catalog")
+        except Exception as e:
+            print(f"Error migrating copy history: {e}")
+    
     def bind_events(self):
         """Bind UI events to handlers"""
         # Auth events
@@ -220,10 +285,8 @@ class YouTube4KCheckerApp:
                 key = self.auth_widgets['api_key_entry'].get().strip()
                 self.config_manager.set('youtube.api_key', key)
                 self.config_manager.save_config()
-                # Re-init API with new key
-                self.youtube_service.api_key = key
+                # Re-init API with new key (api_key is synced by the config subscription)
                 if self.youtube_service.setup_youtube_api():
-                    self.playlist_service.youtube_service = self.youtube_service.youtube
                     self.ui_manager.update_status("✅ API key saved and initialized")
                 else:
                     self.ui_manager.update_status("⚠️ API key saved, but initialization failed")
@@ -256,6 +319,7 @@ class YouTube4KCheckerApp:
         # Playlist events
         self.playlist_widgets['url_entry'].bind('<KeyRelease>', self.event_handlers.on_url_change)
         self.playlist_widgets['paste_button'].configure(command=self.event_handlers.paste_url)
+        self.playlist_widgets['import_button'].configure(command=self.event_handlers.import_videos_from_file)
         
         # Filter events
         self.filter_widgets['max_entry'].bind('<KeyRelease>', self.event_handlers.on_entry_change)
@@ -264,6 +328,9 @@ class YouTube4KCheckerApp:
         # Copied filter
         if 'filter_copied_check' in self.filter_widgets:
             self.filter_widgets['filter_copied_check'].configure(command=self.event_handlers.on_filter_toggle)
+        # Search-as-you-type
+        if 'search_entry' in self.filter_widgets:
+            self.filter_widgets['search_entry'].bind('<KeyRelease>', self.event_handlers.on_search_change)
         
         # Main control events
         self.main_button_widgets['check_button'].configure(command=self.event_handlers.check_4k_quality)
@@ -294,19 +361,13 @@ class YouTube4KCheckerApp:
         )
     
     def setup_authentication(self):
-        """Setup YouTube authentication with better error handling"""
+        """Resolve API key and OAuth credentials on a background thread"""
         try:
             # Setup API key from config (required)
             api_key = self.config_manager.get('youtube.api_key', '')
             self.youtube_service.api_key = api_key or ''
             if not api_key:
                 self.ui_manager.update_status("⚠️ Enter your YouTube API key to enable loading videos.")
-            else:
-                if self.youtube_service.setup_youtube_api():
-                    try:
-                        self.playlist_service.youtube_service = self.youtube_service.youtube
-                    except Exception:
-                        pass
             
             # Setup OAuth credentials
             self.youtube_service.client_secrets_file = os.getenv(
@@ -321,6 +382,24 @@ class YouTube4KCheckerApp:
             print(f"🔐 Client secrets file: {self.youtube_service.client_secrets_file}")
             print(f"🎟️ Token file: {self.youtube_service.token_file}")
             
+            threading.Thread(
+                target=self._authentication_worker,
+                args=(api_key,),
+                name='auth-setup',
+                daemon=True
+            ).start()
+                
+        except Exception as e:
+            print(f"❌ Authentication setup error: {e}")
+            self.ui_manager.update_status(f"⚠️ Authentication setup error: {str(e)}")
+            # Continue anyway - app can still work with limited functionality
+    
+    def _authentication_worker(self, api_key):
+        """Build API clients and load saved OAuth credentials off the UI thread"""
+        try:
+            if api_key:
+                self.youtube_service.setup_youtube_api()
+            
             # API ready is based on presence of key and setup attempt above
             api_ready = bool(api_key and self.youtube_service.youtube)
             if not api_ready:
@@ -331,17 +410,21 @@ class YouTube4KCheckerApp:
                 self.youtube_service.check_existing_authentication()
             except Exception as e:
                 print(f"⚠️ Authentication check warning: {e}")
-            
+        except Exception as e:
+            print(f"❌ Authentication setup error: {e}")
+        
+        def finish():
             # Update auth status (OAuth is optional and only needed for playlist removal)
             try:
                 self.update_auth_status()
             except Exception as e:
                 print(f"⚠️ Auth status update warning: {e}")
-                
-        except Exception as e:
-            print(f"❌ Authentication setup error: {e}")
-            self.ui_manager.update_status(f"⚠️ Authentication setup error: {str(e)}")
-            # Continue anyway - app can still work with limited functionality
+            startup_timer.mark('services ready')
+            self.event_handlers.revalidate_last_session()
+            if self.config_manager.get('advanced.debug_mode', False) or os.getenv('YT4K_STARTUP_REPORT'):
+                print(startup_timer.report())
+        
+        self.ui_manager.safe_update(finish)
     
     def update_auth_status(self):
         """Update authentication status display"""
@@ -358,9 +441,6 @@ class YouTube4KCheckerApp:
                 login_button.config(state='disabled')
                 logout_button.config(state='normal')
                 
-                # Update playlist service
-                self.playlist_service.youtube_service = self.youtube_service.authenticated_youtube
-                
             else:
                 status_label.config(
                     text="❌ Not authenticated",
@@ -382,10 +462,32 @@ class YouTube4KCheckerApp:
             print(f"Application runtime error: {e}")
         finally:
             # Cleanup
+            if self.config_manager.get('advanced.debug_mode', False):
+                try:
+                    print(f"🖼️ Image memory report: {self.tree_manager.get_image_memory_report()}")
+                except Exception:
+                    pass
+            try:
+                self.job_manager.shutdown()
+            except Exception:
+                pass
+            try:
+                self.thumbnail_loader.shutdown()
+            except Exception:
+                pass
             try:
-                self.thumbnail_manager.clear_cache()
+                # Disk cache persists between runs; its size is policed by maintenance
+                self.thumbnail_manager.close()
             except:
                 pass
+            try:
+                self.catalog.close()
+            except Exception:
+                pass
+            try:
+                self.config_manager.flush()
+            except Exception:
+                pass
 
 def main():
     """Application entry point"""
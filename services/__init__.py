@@ -1,13 +1,32 @@
 """
 Services package for YouTube 4K Checker
+Submodules are imported on first attribute access (PEP 562) to keep startup fast
 """
 
-from .playlist_service import PlaylistService
-from .video_operations import VideoOperations
-from .event_handlers import EventHandlers
+_LAZY_EXPORTS = {
+    'PlaylistService': '.playlist_service',
+    'VideoOperations': '.video_operations',
+    'EventHandlers': '.event_handlers',
+    'ScanSession': '.scan_session',
+    'ScanSessionStore': '.scan_session',
+    'JobManager': '.job_manager',
+    'Job': '.job_manager',
+    'CancellationToken': '.job_manager',
+    'VideoImporter': '.video_import'
+}
 
-__all__ = [
-    'PlaylistService',
-    'VideoOperations', 
-    'EventHandlers'
-]
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from core.startup_timing import startup_timer
+    value = getattr(startup_timer.import_module(module_name, __name__), name)
+    globals()[name] = value  # Cache so __getattr__ is not hit again
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -2,24 +2,42 @@
 Event handler service
 Handles UI events and user interactions
 """
+import os
 import tkinter as tk
 from tkinter import messagebox, filedialog
-import threading
 import re
+from .scan_session import ScanSessionStore
+from .job_manager import JobManager
+from .video_import import VideoImporter
 
 class EventHandlers:
     """Service for handling UI events and user interactions"""
     
-    def __init__(self, ui_manager, playlist_service, youtube_service, video_checker, tree_manager):
+    SEARCH_DEBOUNCE_MS = 120
+    # Seconds a job waits for the main thread to pick up its UI call
+    UI_CALL_TIMEOUT = 30
+    
+    def __init__(self, ui_manager, playlist_service, youtube_service, video_checker, tree_manager,
+                 scan_sessions=None, jobs=None):
         self.ui_manager = ui_manager
         self.playlist_service = playlist_service
         self.youtube_service = youtube_service
         self.video_checker = video_checker
         self.tree_manager = tree_manager
         
-        self.stop_requested = False
-        self.is_processing = False
+        # Loads, checks and info lookups run as jobs; busy state is derived from them
+        self.jobs = jobs or JobManager()
         self.auto_check_after_load = False
+        self._restored_playlist = None  # Playlist shown from the snapshot, awaiting refresh
+        self._current_source = None  # ('playlist', id) etc. the listed rows came from
+        self._search_after_id = None
+        # Journals of in-progress scans (resume after stop/crash)
+        self.scan_sessions = scan_sessions or ScanSessionStore()
+    
+    @property
+    def is_processing(self):
+        """True while a playlist load, import or 4K check is queued or running"""
+        return self.jobs.is_busy((JobManager.LOAD, JobManager.IMPORT, JobManager.CHECK))
     
     def on_url_change(self, event=None):
         """Handle URL entry changes"""
@@ -45,15 +63,23 @@ class EventHandlers:
                         info_label.config(text="🔄 Loading playlist info...")
                     self.ui_manager.safe_update(update)
                     
-                    # Update playlist info in background
-                    self.playlist_service.update_playlist_info_async(
-                        playlist_id, 
-                        self.on_playlist_info_updated
+                    # Update playlist info in background (a newer URL supersedes older lookups)
+                    self.jobs.submit(
+                        JobManager.INFO, self._fetch_playlist_info, playlist_id,
+                        name=f"Info {playlist_id}", priority=JobManager.PRIORITY_LOW, replace=True
                     )
                 else:
                     def update():
                         info_label.config(text="❌ Invalid playlist URL")
                     self.ui_manager.safe_update(update)
+            elif self.playlist_service.is_valid_channel_url(url):
+                def update():
+                    info_label.config(text="🔄 Looking up channel...")
+                self.ui_manager.safe_update(update)
+                self.jobs.submit(
+                    JobManager.INFO, self._fetch_channel_info, url,
+                    name="Channel info", priority=JobManager.PRIORITY_LOW, replace=True
+                )
             else:
                 def update():
                     info_label.config(text="⚠️ Not a playlist URL")
@@ -62,6 +88,16 @@ class EventHandlers:
         except Exception as e:
             print(f"Error in URL change handler: {e}")
     
+    def _fetch_playlist_info(self, token, playlist_id):
+        """Job: look up playlist title/count for the info label"""
+        info = self.playlist_service.get_playlist_info(playlist_id)
+        if token.is_cancelled:
+            return None
+        self.playlist_service.current_playlist_info = info
+        if info:
+            self.on_playlist_info_updated(info)
+        return info
+    
     def on_playlist_info_updated(self, playlist_info):
         """Handle playlist info update"""
         try:
@@ -91,6 +127,12 @@ class EventHandlers:
             if url_entry:
                 try:
                     clipboard_text = self.ui_manager.root.clipboard_get()
+                    if not self.playlist_service.is_valid_playlist_url(clipboard_text.strip()):
+                        # Video links, or nothing but bare IDs: import (plain text is just pasted)
+                        if (not self.playlist_service.is_valid_channel_url(clipboard_text.strip())
+                                and VideoImporter.looks_like_video_list(clipboard_text)):
+                            self.import_videos_from_clipboard(clipboard_text)
+                            return
                     url_entry.delete(0, tk.END)
                     url_entry.insert(0, clipboard_text.strip())
                     
@@ -108,7 +150,7 @@ class EventHandlers:
     def load_playlist(self):
         """Load playlist videos"""
         try:
-            if self.is_processing:
+            if self.jobs.is_busy((JobManager.CHECK,)):
                 self.ui_manager.update_status("⚠️ Already processing, please wait...")
                 return
             
@@ -154,16 +196,21 @@ class EventHandlers:
                 except ValueError:
                     max_results = 50
             
-            # Start loading in background thread
+            # Start loading as a job; a newer load replaces one still running
             self.ui_manager.update_status("🚀 Loading playlist videos...")
             self.ui_manager.set_loading_state(True)
             
-            thread = threading.Thread(
-                target=self._load_playlist_thread,
-                args=(playlist_id, max_results),
-                daemon=True
+            self.jobs.cancel_type(JobManager.IMPORT)
+            load_job = self.jobs.submit(
+                JobManager.LOAD, self._load_playlist_thread, playlist_id, max_results,
+                name=f"Load {playlist_id}", replace=True
             )
-            thread.start()
+            # The 4K check is queued behind the load and starts only if it succeeds
+            if load_job:
+                self.jobs.submit(
+                    JobManager.CHECK, self._auto_check_job, load_job,
+                    name="Check 4K (after load)", after=load_job
+                )
             
         except Exception as e:
             print(f"Error loading playlist: {e}")
@@ -173,20 +220,17 @@ class EventHandlers:
                 'error'
             )
     
-    def _load_playlist_thread(self, playlist_id, max_results):
-        """Background thread for loading playlist"""
+    def _load_playlist_thread(self, token, playlist_id, max_results):
+        """Job: load playlist videos; returns True once they are handed to the tree"""
         try:
-            self.is_processing = True
-            
             # Ensure YouTube service is ready (with retry)
             max_retries = 3
             for attempt in range(max_retries):
                 try:
                     # Verify service is available
+                    # PlaylistService shares YouTubeAPIService's client; rebuilding is local
                     if not self.playlist_service.youtube_service:
-                        if not self.youtube_service.youtube:
-                            self.youtube_service.setup_youtube_api()
-                        self.playlist_service.youtube_service = self.youtube_service.youtube
+                        self.youtube_service.setup_youtube_api()
                     
                     # Test API connection with a simple call
                     test_request = self.playlist_service.youtube_service.playlists().list(
@@ -243,6 +287,9 @@ class EventHandlers:
             
             # Get videos from playlist
             videos = self.playlist_service.get_playlist_videos(playlist_id, max_results)
+            if token.is_cancelled:
+                self.ui_manager.safe_update(lambda: self.ui_manager.set_loading_state(False))
+                return False
             
             if not videos:
                 def update():
@@ -262,44 +309,25 @@ class EventHandlers:
                 self.ui_manager.update_status(f"📊 Getting video details for {len(videos)} videos...")
             self.ui_manager.safe_update(count_update)
             
-            # Get video details (quality info) with retry
-            video_details = {}
-            for retry_attempt in range(2):  # Max 2 attempts for video details
-                try:
-                    video_ids = [video['id'] for video in videos]
-                    video_details = self.youtube_service.get_video_details(video_ids)
-                    break
-                except Exception as e:
-                    print(f"Video details attempt {retry_attempt + 1} failed: {e}")
-                    if retry_attempt == 0:
-                        def retry_update():
-                            self.ui_manager.update_status("🔄 Retrying video details...")
-                        self.ui_manager.safe_update(retry_update)
-                        
-                        import time
-                        time.sleep(1)
-                    else:
-                        print("Using basic video info without quality details")
-                        # Continue with basic info only
-                        for video in videos:
-                            video_details[video['id']] = {'definition': 'hd'}  # Default
+            english_count = self._merge_video_details(videos)
             
-            # Merge details with playlist info and count English videos
-            english_count = 0
-            for video in videos:
-                details = video_details.get(video['id'], {'definition': 'hd'})
-                video.update(details)
-                if video.get('is_english'):
-                    english_count += 1
+            if token.is_cancelled:
+                self.ui_manager.safe_update(lambda: self.ui_manager.set_loading_state(False))
+                return False
+            
+            self._persist_playlist(playlist_id, videos)
             
             # Update UI
             def update_ui():
                 self.ui_manager.set_loading_state(False)
+                if token.is_cancelled:
+                    return  # Stopped or superseded by a newer load
                 
                 # Clear existing videos
                 tree = self.ui_manager.get_element('video_tree')
                 if tree:
                     self.tree_manager.clear_tree(tree)
+                self._current_source = ('playlist', playlist_id)
                 
                 # Add videos to tree
                 for video in videos:
@@ -313,17 +341,11 @@ class EventHandlers:
                 
                 extra = f" • EN: {english_count}" if english_count else ""
                 self.ui_manager.update_status(f"✅ Loaded {len(videos)} videos from playlist{extra}")
-                
-                # Auto-start 4K checking if enabled or requested by Check 4K
-                if self.auto_check_after_load:
-                    self.auto_check_after_load = False
-                    self.ui_manager.root.after(300, self.check_4k_quality)
-                else:
-                    auto_check = self.ui_manager.get_element('auto_check_4k')
-                    if auto_check and getattr(auto_check, 'get', lambda: True)():
-                        self.ui_manager.root.after(1000, self.check_4k_quality)
+                self._remember_session(playlist_id, max_results)
             
+            # The auto-check follow-up job waits for this update (run_on_ui_thread is FIFO after it)
             self.ui_manager.safe_update(update_ui)
+            return True
             
         except Exception as e:
             print(f"Error in playlist loading thread: {e}")
@@ -338,56 +360,401 @@ class EventHandlers:
                 )
             
             self.ui_manager.safe_update(error_update)
+            return False
+    
+    def _merge_video_details(self, videos):
+        """Merge API details (quality, language) into playlist videos; returns the English count"""
+        # Get video details (quality info) with retry
+        video_details = {}
+        for retry_attempt in range(2):  # Max 2 attempts for video details
+            try:
+                video_ids = [video['id'] for video in videos]
+                video_details = self.youtube_service.get_video_details(video_ids)
+                break
+            except Exception as e:
+                print(f"Video details attempt {retry_attempt + 1} failed: {e}")
+                if retry_attempt == 0:
+                    def retry_update():
+                        self.ui_manager.update_status("🔄 Retrying video details...")
+                    self.ui_manager.safe_update(retry_update)
+                    
+                    import time
+                    time.sleep(1)
+                else:
+                    print("Using basic video info without quality details")
+                    # Continue with basic info only
+                    for video in videos:
+                        video_details[video['id']] = {'definition': 'hd', 'details_unavailable': True}  # Default
+        
+        # Merge details with playlist info and count English videos
+        english_count = 0
+        for video in videos:
+            details = video_details.get(video['id'], {'definition': 'hd', 'details_unavailable': True})
+            if details.get('details_unavailable'):
+                # Placeholders only fill gaps; playlist title/channel/thumbnail stay
+                for key, value in details.items():
+                    video.setdefault(key, value)
+                video['details_unavailable'] = True
+            else:
+                video.update(details)
+            if video.get('is_english'):
+                english_count += 1
+        return english_count
+    
+    def _persist_playlist(self, playlist_id, videos):
+        """Persist videos and playlist membership in the local catalog (next session's snapshot)"""
+        catalog = self.ui_manager.get_element('catalog')
+        if catalog:
+            try:
+                catalog.upsert_videos(videos)
+                catalog.upsert_playlist(playlist_id, self.playlist_service.current_playlist_info)
+                catalog.set_playlist_videos(playlist_id, videos)
+            except Exception as e:
+                print(f"Error updating catalog: {e}")
+    
+    def _remember_session(self, playlist_id, max_results):
+        """UI thread: note the loaded playlist so the next launch can restore it"""
+        config_manager = self.ui_manager.get_element('config_manager')
+        if config_manager:
+            try:
+                config_manager.set('session.last_playlist_id', playlist_id)
+                config_manager.set('session.last_max_results', max_results)
+                config_manager.save_config()
+            except Exception as e:
+                print(f"Error saving session: {e}")
+    
+    # --- Warm start ----------------------------------------------------------
+    
+    def restore_last_session(self):
+        """
+        UI thread: show the last loaded playlist from the catalog right away
+        (rows, last check results, cached thumbnails); returns True if restored.
+        revalidate_last_session() brings it up to date once the API is ready.
+        """
+        try:
+            config_manager = self.ui_manager.get_element('config_manager')
+            catalog = self.ui_manager.get_element('catalog')
+            tree = self.ui_manager.get_element('video_tree')
+            if not config_manager or not catalog or not tree:
+                return False
+            if not config_manager.get('ui.restore_last_session', True):
+                return False
+            playlist_id = config_manager.get('session.last_playlist_id', '')
+            if not playlist_id or self.tree_manager.video_data:
+                return False
+            
+            videos = catalog.get_playlist_videos(playlist_id)
+            if not videos:
+                return False
+            
+            url_entry = self.ui_manager.get_element('url_entry')
+            if url_entry and not url_entry.get().strip():
+                url_entry.insert(0, f"https://www.youtube.com/playlist?list={playlist_id}")
+            
+            for video in videos:
+                self.tree_manager.add_video_to_tree(tree, video)
+            
+            count_label = self.ui_manager.get_element('count_label')
+            if count_label:
+                count_label.config(text=f"{len(videos)} videos")
+            info = catalog.get_playlist(playlist_id)
+            info_label = self.ui_manager.get_element('info_label')
+            if info_label and info and info.get('title'):
+                text = f"📋 {info['title']} ({len(videos)} videos)"
+                info_label.config(text=text[:60] + ('...' if len(text) > 60 else ''))
+            
+            self._restored_playlist = playlist_id
+            self._current_source = ('playlist', playlist_id)
+            self.ui_manager.update_status(f"♻️ Restored {len(videos)} videos from last session")
+            return True
+        except Exception as e:
+            print(f"Error restoring last session: {e}")
+            return False
+    
+    def revalidate_last_session(self):
+        """Refresh the restored playlist in the background and apply only the differences"""
+        playlist_id = self._restored_playlist
+        self._restored_playlist = None
+        if not playlist_id or not self.playlist_service.youtube_service:
+            return None
+        config_manager = self.ui_manager.get_element('config_manager')
+        max_results = 50
+        if config_manager:
+            max_results = config_manager.get('session.last_max_results', 50) or 50
+        
+        # A user load (replace=True) supersedes this one
+        job = self.jobs.submit(
+            JobManager.LOAD, self._revalidate_playlist_thread, playlist_id, max_results,
+            name=f"Refresh {playlist_id}", priority=JobManager.PRIORITY_LOW
+        )
+        if job:
+            # Only runs if the user pressed Check 4K while the refresh was running
+            self.jobs.submit(
+                JobManager.CHECK, self._auto_check_job, job, requested_only=True,
+                name="Check 4K (after refresh)", after=job
+            )
+        return job
+    
+    def _revalidate_playlist_thread(self, token, playlist_id, max_results):
+        """Job: fetch the playlist again and patch the restored rows"""
+        self.ui_manager.safe_update(lambda: self.ui_manager.update_status("🔄 Checking playlist for changes..."))
+        videos = self.playlist_service.get_playlist_videos(playlist_id, max_results)
+        if token.is_cancelled:
+            return False
+        if not videos:
+            # Keep the snapshot rather than emptying the list on a failed refresh
+            self.ui_manager.safe_update(
+                lambda: self.ui_manager.update_status("⚠️ Could not refresh playlist; showing last session")
+            )
+            return False
+        
+        self._merge_video_details(videos)
+        if token.is_cancelled:
+            return False
+        self._persist_playlist(playlist_id, videos)
+        
+        def apply_diff():
+            tree = self.ui_manager.get_element('video_tree')
+            if token.is_cancelled or not tree:
+                return
+            added, removed, updated = self.tree_manager.apply_playlist_diff(tree, videos)
+            count_label = self.ui_manager.get_element('count_label')
+            if count_label:
+                count_label.config(text=f"{len(videos)} videos")
+            if added or removed or updated:
+                self.ui_manager.update_status(
+                    f"✅ Playlist refreshed: +{added} new, -{removed} removed, {updated} updated"
+                )
+            else:
+                self.ui_manager.update_status(f"✅ Playlist up to date ({len(videos)} videos)")
         
-        finally:
-            self.is_processing = False
+        self.ui_manager.safe_update(apply_diff)
+        return True
+    
+    # --- Bulk import ---------------------------------------------------------
+    
+    def import_videos_from_file(self):
+        """Import video URLs/IDs from a text or CSV file"""
+        try:
+            path = filedialog.askopenfilename(
+                title="Import videos",
+                filetypes=[("Text or CSV", "*.txt *.csv *.tsv *.list"), ("All files", "*.*")]
+            )
+            if not path:
+                return
+            self._start_import(VideoImporter.iter_file_lines(path), os.path.basename(path))
+        except Exception as e:
+            print(f"Error importing videos from file: {e}")
+            self.ui_manager.show_message_dialog("Import Error", f"Error importing videos: {str(e)}", 'error')
+    
+    def import_videos_from_clipboard(self, text=None):
+        """Import video URLs/IDs from clipboard text"""
+        try:
+            if text is None:
+                try:
+                    text = self.ui_manager.root.clipboard_get()
+                except tk.TclError:
+                    self.ui_manager.update_status("❌ No text in clipboard")
+                    return
+            self._start_import(VideoImporter.iter_text_lines(text), "clipboard")
+        except Exception as e:
+            print(f"Error importing videos from clipboard: {e}")
+    
+    def _start_import(self, lines, source):
+        """UI thread: replace the list with videos whose URLs/IDs are in lines (read lazily)"""
+        stats = {}
+        importer = VideoImporter(self.youtube_service)
+        return self._start_video_stream(
+            lambda token: importer.iter_video_ids(lines, stats), source, stats,
+            info_text=f"📥 Imported from {source}", clear_url=True, source_key=('import', source)
+        )
+    
+    def _start_video_stream(self, id_source, source, stats, info_text, clear_url=False, source_key=None):
+        """
+        UI thread: replace the list with an IMPORT job fed by id_source(token),
+        an iterator of video IDs consumed as the job runs; source_key becomes
+        _current_source once the first batch replaces the rows
+        """
+        if self.jobs.is_busy((JobManager.CHECK,)):
+            self.ui_manager.update_status("⚠️ Already processing, please wait...")
+            return None
+        if not self.youtube_service.youtube:
+            self.ui_manager.show_message_dialog(
+                "API Key Required",
+                "Enter your YouTube API key before importing videos.",
+                'warning'
+            )
+            return None
+        
+        # An imported list is not a playlist: scans are not journaled against the old URL
+        url_entry = self.ui_manager.get_element('url_entry')
+        if url_entry and clear_url:
+            url_entry.delete(0, tk.END)
+        info_label = self.ui_manager.get_element('info_label')
+        if info_label:
+            info_label.config(text=info_text[:60])
+        self._restored_playlist = None
+        self.jobs.cancel_type(JobManager.LOAD)
+        
+        self.ui_manager.update_status(f"📥 Importing videos from {source}...")
+        self.ui_manager.set_loading_state(True)
+        import_job = self.jobs.submit(
+            JobManager.IMPORT, self._import_videos_thread, id_source, source, stats, source_key,
+            name=f"Import {source}", replace=True
+        )
+        if import_job:
+            # Check 4K pressed during the import runs once it finishes
+            self.jobs.submit(
+                JobManager.CHECK, self._auto_check_job, import_job, requested_only=True,
+                name="Check 4K (after import)", after=import_job
+            )
+        return import_job
+    
+    def _import_videos_thread(self, token, id_source, source, stats, source_key=None):
+        """Job: stream IDs from id_source, fetch details 50 at a time and append rows per batch"""
+        importer = VideoImporter(self.youtube_service)
+        total = 0
+        first_batch = True
+        try:
+            for videos in importer.iter_video_details(id_source(token), token, stats):
+                if token.is_cancelled:
+                    break
+                
+                def add_batch(videos=videos, replace=first_batch):
+                    tree = self.ui_manager.get_element('video_tree')
+                    if token.is_cancelled or not tree:
+                        return False
+                    if replace:
+                        self.tree_manager.clear_tree(tree)
+                        self._current_source = source_key
+                    for video in videos:
+                        self.tree_manager.add_video_to_tree(tree, video)
+                    count_label = self.ui_manager.get_element('count_label')
+                    if count_label:
+                        count_label.config(text=f"{len(self.tree_manager.video_data)} videos")
+                    return True
+                
+                # Waits for the rows to be added, so at most one batch is held in memory
+                added = self.ui_manager.run_on_ui_thread(
+                    add_batch, timeout=self.UI_CALL_TIMEOUT, cancel_token=token
+                )
+                if not added:
+                    if not token.is_cancelled:
+                        print("Import stopped: the UI did not take the batch in time")
+                        token.cancel()
+                    break
+                first_batch = False
+                total += len(videos)
+                self.ui_manager.update_status(f"📥 Importing from {source}: {total} videos...")
+        except Exception as e:
+            print(f"Error in import thread: {e}")
+            
+            def error_update():
+                self.ui_manager.set_loading_state(False)
+                self.ui_manager.update_status(f"❌ Error importing videos: {str(e)}")
+            self.ui_manager.safe_update(error_update)
+            return False
+        
+        def final_update():
+            self.ui_manager.set_loading_state(False)
+            if token.is_cancelled:
+                self.ui_manager.update_status(f"⏹️ Import stopped after {total} videos")
+                return
+            if not total:
+                self.ui_manager.update_status(f"❌ No videos found in {source}")
+                return
+            extra = []
+            if stats.get('duplicates'):
+                extra.append(f"{stats['duplicates']} duplicates skipped")
+            if stats.get('missing'):
+                extra.append(f"{stats['missing']} unavailable")
+            suffix = f" ({', '.join(extra)})" if extra else ""
+            self.ui_manager.update_status(f"✅ Imported {total} videos from {source}{suffix}")
+        
+        self.ui_manager.safe_update(final_update)
+        return total > 0 and not token.is_cancelled
+    
+    # --- Channel scan --------------------------------------------------------
+    
+    def scan_channel(self, url):
+        """UI thread: list every upload of a channel (URL or @handle) as it streams in"""
+        if not self.youtube_service.youtube:
+            self.ui_manager.show_message_dialog(
+                "API Key Required",
+                "Enter your YouTube API key before scanning a channel.",
+                'warning'
+            )
+            return None
+        stats = {}
+        
+        def uploads_ids(token):
+            channel = self.playlist_service.resolve_channel(url)
+            if not channel:
+                raise ValueError("Channel not found")
+            self.ui_manager.update_status(f"📺 Listing uploads of {channel['title']}...")
+            # Pages are consumed as they arrive; the full upload list is never built
+            for page in self.playlist_service.iter_playlist_pages(channel['uploads_playlist_id'], token=token):
+                for video in page:
+                    yield video['id']
+        
+        return self._start_video_stream(
+            uploads_ids, "channel", stats, info_text="📺 Channel uploads", source_key=self._url_source(url)
+        )
+    
+    def _fetch_channel_info(self, token, url):
+        """Job: resolve a channel for the info label"""
+        channel = self.playlist_service.resolve_channel(url)
+        if token.is_cancelled:
+            return None
+        info_label = self.ui_manager.get_element('info_label')
+        if info_label:
+            text = f"📺 {channel['title']} (all uploads)" if channel else "❌ Channel not found"
+            self.ui_manager.safe_update(lambda: info_label.config(text=text[:60] + ('...' if len(text) > 60 else '')))
+        return channel
     
     def check_4k_quality(self):
         """Start 4K quality checking"""
         try:
-            if self.is_processing:
+            if self.jobs.is_busy((JobManager.LOAD, JobManager.IMPORT)):
+                # The check queued behind the load/import picks this up
+                self.auto_check_after_load = True
+                self.ui_manager.update_status("⏳ 4K check will start when the playlist has loaded")
+                return
+            if self.jobs.is_busy((JobManager.CHECK,)):
                 self.ui_manager.update_status("⚠️ Already processing, please wait...")
                 return
             
             tree = self.ui_manager.get_element('video_tree')
-            if not tree or len(tree.get_children()) == 0:
-                # Auto-load playlist if URL is present
-                url_entry = self.ui_manager.get_element('url_entry')
-                url = url_entry.get().strip() if url_entry else ''
-                if url and self.playlist_service.is_valid_playlist_url(url):
-                    self.auto_check_after_load = True
+            url_entry = self.ui_manager.get_element('url_entry')
+            url = url_entry.get().strip() if url_entry else ''
+            requested_source = self._url_source(url)
+            has_rows = bool(tree and tree.get_children())
+            # Load what the URL names unless the rows already came from it (e.g. a restored list)
+            if requested_source and (not has_rows or requested_source != self._current_source):
+                self.auto_check_after_load = True
+                if requested_source[0] == 'playlist':
                     self.load_playlist()
-                    return
                 else:
-                    self.ui_manager.show_message_dialog(
-                        "No Videos",
-                        "Enter a playlist URL, then press 'Check 4K' again to auto-load and scan.",
-                        'warning'
-                    )
-                    return
-            
-            # Collect video data
-            video_details = []
-            for item in tree.get_children():
-                video_data = self.tree_manager.video_data.get(item, {})
-                if video_data:
-                    video_details.append(video_data)
+                    self.scan_channel(url)
+                return
             
-            if not video_details:
-                self.ui_manager.update_status("❌ No video data available")
+            if not has_rows:
+                self.ui_manager.show_message_dialog(
+                    "No Videos",
+                    "Enter a playlist or channel URL, then press 'Check 4K' again to auto-load and scan.",
+                    'warning'
+                )
                 return
             
-            self.stop_requested = False
-            self.ui_manager.update_status("🚀 Starting 4K quality check...")
-            self.ui_manager.set_checking_state(True)
+            prepared = self._prepare_check(tree)
+            if not prepared:
+                return
+            session, video_details = prepared
             
-            # Start checking in background thread
-            thread = threading.Thread(
-                target=self._check_4k_thread,
-                args=(video_details,),
-                daemon=True
+            self.jobs.submit(
+                JobManager.CHECK, self._check_4k_thread, video_details, session,
+                name=f"Check 4K ({len(video_details)} videos)"
             )
-            thread.start()
             
         except Exception as e:
             print(f"Error starting 4K check: {e}")
@@ -397,13 +764,133 @@ class EventHandlers:
                 'error'
             )
     
-    def _check_4k_thread(self, video_details):
-        """Background thread for 4K checking"""
+    def _prepare_check(self, tree):
+        """UI thread: collect rows and start/resume the journal; returns (session, videos) or None"""
+        # Collect video data
+        video_details = []
+        for item in tree.get_children():
+            video_data = self.tree_manager.video_data.get(item, {})
+            if video_data:
+                video_details.append(video_data)
+        
+        if not video_details:
+            self.ui_manager.update_status("❌ No video data available")
+            return None
+        
+        # Journal the scan; offer to resume an interrupted one for the same source
+        session, video_details = self._prepare_scan_session(tree, video_details)
+        if not video_details:
+            if session:
+                session.complete()
+            self.ui_manager.update_status("✅ Nothing left to check from the previous scan")
+            return None
+        
+        self.ui_manager.update_status("🚀 Starting 4K quality check...")
+        self.ui_manager.set_checking_state(True)
+        return session, video_details
+    
+    def _prepare_auto_check(self, load_job, requested_only=False):
+        """UI thread: decide whether the check queued after a load should run"""
+        requested = self.auto_check_after_load
+        self.auto_check_after_load = False
+        if not load_job.result:
+            return None
+        auto_check = self.ui_manager.get_element('auto_check_4k')
+        if requested_only and not requested:
+            return None
+        if not requested and not (auto_check and getattr(auto_check, 'get', lambda: True)()):
+            return None
+        tree = self.ui_manager.get_element('video_tree')
+        if not tree:
+            return None
+        return self._prepare_check(tree)
+    
+    def _auto_check_job(self, token, load_job, requested_only=False):
+        """Job queued after a load: run the 4K check if enabled or requested"""
+        prepared = self.ui_manager.run_on_ui_thread(
+            self._prepare_auto_check, load_job, requested_only,
+            timeout=self.UI_CALL_TIMEOUT, cancel_token=token
+        )
+        if not prepared:
+            return None
+        session, video_details = prepared
+        if token.is_cancelled:
+            if session:
+                session.close()
+            self.ui_manager.safe_update(lambda: self.ui_manager.set_checking_state(False))
+            return None
+        return self._check_4k_thread(token, video_details, session)
+    
+    def _url_source(self, url):
+        """('playlist', id) or ('channel', reference) for a URL, else None; compared with _current_source"""
+        if url and self.playlist_service.is_valid_playlist_url(url):
+            playlist_id = self.playlist_service.extract_playlist_id(url)
+            if playlist_id:
+                return 'playlist', playlist_id
+        if url and self.playlist_service.is_valid_channel_url(url):
+            kind, value = self.playlist_service.extract_channel_reference(url)
+            # Handles and usernames are case-insensitive
+            return 'channel', f"{kind}:{value if kind == 'id' else value.lower()}"
+        return None
+    
+    def _get_scan_source(self):
+        """Return (journal key, url) for the list being scanned, or (None, '')"""
         try:
-            self.is_processing = True
+            url_entry = self.ui_manager.get_element('url_entry')
+            url = url_entry.get().strip() if url_entry else ''
+            source = self._url_source(url)
+            if source:
+                kind, value = source
+                # Playlists keep the bare ID as key so existing journals still resume
+                return (value if kind == 'playlist' else f"{kind}:{value}"), url
+        except Exception as e:
+            print(f"Error resolving scan source: {e}")
+        return None, ''
+    
+    def _prepare_scan_session(self, tree, video_details):
+        """Start or resume a scan journal; returns (session, videos still to check)"""
+        scan_key, scan_url = self._get_scan_source()
+        if not scan_key:
+            return None, video_details
+        
+        try:
+            previous = self.scan_sessions.find_resumable(scan_key)
+            loaded_ids = {v.get('id') for v in video_details}
+            if previous and loaded_ids.intersection(previous.pending_ids()):
+                summary = previous.summary()
+                resume = messagebox.askyesno(
+                    "Resume Scan",
+                    f"A previous scan of this playlist stopped after {summary['done']}/{summary['total']} videos"
+                    f"{' (' + str(summary['failed']) + ' failed)' if summary['failed'] else ''}.\n\n"
+                    f"Resume and check only the {summary['pending']} unfinished videos?"
+                )
+                if resume:
+                    # Show earlier verdicts and skip those videos
+                    done = previous.done_ids
+                    for vid in done:
+                        item = self.tree_manager.get_item_id_by_video_id(vid)
+                        if item and tree.exists(item):
+                            self.tree_manager.update_video_status(tree, item, previous.results[vid])
+                    remaining = [v for v in video_details if v.get('id') not in done]
+                    self.ui_manager.update_status(f"♻️ Resuming scan: {len(done)} already checked, {len(remaining)} to go")
+                    return previous, remaining
+            
+            return self.scan_sessions.start(scan_key, [v.get('id') for v in video_details], scan_url), video_details
+        except Exception as e:
+            print(f"Error preparing scan session: {e}")
+            return None, video_details
+    
+    def _check_4k_thread(self, token, video_details, session=None):
+        """Job: check 4K availability of video_details"""
+        try:
+            # Stop requests reach the checker through the job's token
+            token.on_cancel(self.video_checker.stop_checking)
             
             def progress_callback(video, status):
                 """Update individual video status"""
+                # Journal first so a crash right after still keeps the verdict
+                if session:
+                    session.record(video.get('id'), status)
                 try:
                     tree = self.ui_manager.get_element('video_tree')
                     if not tree:
@@ -426,7 +913,7 @@ class EventHandlers:
             
             def stop_check():
                 """Check if stop was requested"""
-                return self.stop_requested
+                return token.is_cancelled
             
             # Start parallel 4K checking
             found_4k = self.video_checker.check_videos_parallel(
@@ -436,12 +923,19 @@ class EventHandlers:
                 stop_check
             )
             
+            # Stopped scans keep their journal for a later resume
+            if session:
+                if token.is_cancelled:
+                    session.close()
+                else:
+                    session.complete()
+            
             # Update final status
             def final_update():
                 self.ui_manager.set_checking_state(False)
                 
-                if self.stop_requested:
-                    self.ui_manager.update_status("⏹️ 4K check stopped by user")
+                if token.is_cancelled:
+                    self.ui_manager.update_status("⏹️ 4K check stopped by user (press Check 4K to resume)")
                 else:
                     message = f"✅ 4K check complete! Found {len(found_4k)} videos with 4K quality"
                     self.ui_manager.update_status(message)
@@ -454,9 +948,12 @@ class EventHandlers:
                         )
             
             self.ui_manager.safe_update(final_update)
+            return found_4k
             
         except Exception as e:
             print(f"Error in 4K check thread: {e}")
+            if session:
+                session.close()
             
             def error_update():
                 self.ui_manager.set_checking_state(False)
@@ -468,15 +965,14 @@ class EventHandlers:
                 )
             
             self.ui_manager.safe_update(error_update)
-        
-        finally:
-            self.is_processing = False
+            return None
     
     def stop_processing(self):
         """Stop current processing"""
         try:
-            self.stop_requested = True
-            self.video_checker.stop_checking()
+            self.auto_check_after_load = False
+            # Cancels running and queued loads/imports/checks (including a check queued after a load)
+            self.jobs.cancel_type(JobManager.LOAD, JobManager.IMPORT, JobManager.CHECK)
             self.ui_manager.update_status("🛑 Stopping process...")
             
         except Exception as e:
@@ -520,35 +1016,68 @@ class EventHandlers:
         try:
             filter_4k_var = self.ui_manager.get_element('filter_4k_var')
             filter_copied_var = self.ui_manager.get_element('filter_copied_var')
+            query = self._get_search_query()
+            show_4k = bool(filter_4k_var and filter_4k_var.get())
+            show_copied = bool(filter_copied_var and filter_copied_var.get())
             
-            # If neither filter is enabled, show all
-            if (not filter_4k_var or not filter_4k_var.get()) and (not filter_copied_var or not filter_copied_var.get()):
+            # If no filter is enabled, show all
+            if not show_4k and not show_copied and not query:
                 self.show_all_videos()
                 return
 
             # Apply combined filters
-            self.apply_filters(show_4k=bool(filter_4k_var and filter_4k_var.get()),
-                               show_copied=bool(filter_copied_var and filter_copied_var.get()))
+            self.apply_filters(show_4k=show_4k, show_copied=show_copied, query=query)
                 
         except Exception as e:
             print(f"Error in filter toggle: {e}")
     
-    def apply_filters(self, show_4k=False, show_copied=False):
-        """Apply non-destructive filters for 4K and/or Copied."""
+    def on_search_change(self, event=None):
+        """Handle search entry typing (debounced so fast typing filters once)"""
+        try:
+            root = self.ui_manager.root
+            if self._search_after_id is not None:
+                try:
+                    root.after_cancel(self._search_after_id)
+                except Exception:
+                    pass
+
+            def run():
+                self._search_after_id = None
+                self.on_filter_toggle()
+
+            self._search_after_id = root.after(self.SEARCH_DEBOUNCE_MS, run)
+        except Exception as e:
+            print(f"Error in search handler: {e}")
+    
+    def _get_search_query(self):
+        """Current text of the search box"""
+        try:
+            search_entry = self.ui_manager.get_element('search_entry')
+            return search_entry.get().strip() if search_entry else ''
+        except Exception:
+            return ''
+    
+    def apply_filters(self, show_4k=False, show_copied=False, query=''):
+        """Apply non-destructive filters for 4K, Copied and/or search text."""
         try:
             tree = self.ui_manager.get_element('video_tree')
             if not tree:
                 return
 
-            # Collect copied ids once if needed
-            copied_ids = set()
-            if show_copied and self.tree_manager and self.tree_manager._get_config_manager():
-                copied_ids = set(self.tree_manager._get_config_manager().get('history.copied_video_ids', []) or [])
+            # Copied rows come from the in-memory copy history (constant-time per row)
+            copied_items = set()
+            if show_copied and self.tree_manager:
+                copied_items = set(self.tree_manager.get_copied_items())
+
+            # Search hits come from the prebuilt index (None = no search filter)
+            matches = self.tree_manager.search_items(query) if (query and self.tree_manager) else None
 
-            # Iterate over all known items
+            # Iterate over all known items in load order
             all_items = list(self.tree_manager.video_data.keys()) if self.tree_manager else list(tree.get_children())
-            visible_count = 0
+            visible = []
             for item in all_items:
+                if matches is not None and item not in matches:
+                    continue
                 if not tree.exists(item):
                     continue
                 ok = True
@@ -556,27 +1085,24 @@ class EventHandlers:
                     quality = tree.set(item, 'status')
                     ok = ok and bool(quality and '4K' in str(quality).upper())
                 if show_copied:
-                    vid = self.tree_manager.video_data.get(item, {}).get('id') if self.tree_manager else None
-                    ok = ok and bool(vid and vid in copied_ids)
+                    ok = ok and item in copied_items
                 if ok:
-                    try:
-                        tree.reattach(item, '', 'end')
-                        visible_count += 1
-                    except Exception:
-                        pass
-                else:
-                    try:
-                        tree.detach(item)
-                    except Exception:
-                        pass
+                    visible.append(item)
+
+            # One call replaces the visible rows; everything else is detached
+            tree.set_children('', *visible)
+            visible_count = len(visible)
 
             # Status
-            if show_4k and show_copied:
-                self.ui_manager.update_status(f"🔍 Showing Copied 4K videos ({visible_count})")
-            elif show_4k:
-                self.ui_manager.update_status(f"🔍 Showing only 4K videos ({visible_count})")
-            elif show_copied:
-                self.ui_manager.update_status(f"🔍 Showing only Copied videos ({visible_count})")
+            parts = []
+            if show_copied:
+                parts.append("Copied")
+            if show_4k:
+                parts.append("4K")
+            label = f"only {' '.join(parts)} videos" if parts else "videos"
+            if query:
+                label += f" matching '{query}'"
+            self.ui_manager.update_status(f"🔍 Showing {label} ({visible_count})")
         except Exception as e:
             print(f"Error applying filters: {e}")
     
@@ -587,14 +1113,9 @@ class EventHandlers:
             if not tree:
                 return
 
-            # Reattach all known items (including previously detached)
+            # Reattach all known items (including previously detached) in load order
             all_items = list(self.tree_manager.video_data.keys()) if self.tree_manager else list(tree.get_children())
-            for item in all_items:
-                if tree.exists(item):
-                    try:
-                        tree.reattach(item, '', 'end')
-                    except Exception:
-                        pass
+            tree.set_children('', *[item for item in all_items if tree.exists(item)])
             
             self.ui_manager.update_status("📺 Showing all videos")
             
@@ -0,0 +1,310 @@
+"""
+Background job manager
+Schedules loads, checks, removals and info lookups with priorities,
+per-type concurrency limits, cooperative cancellation and follow-ups
+"""
+import itertools
+import threading
+import time
+
+class JobCancelled(Exception):
+    """Raised by CancellationToken.raise_if_cancelled()"""
+
+
+class CancellationToken:
+    """Cooperative cancellation flag handed to every job target"""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+
+    @property
+    def is_cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error in cancel callback: {e}")
+
+    def on_cancel(self, callback):
+        """Run callback when cancelled (immediately if already cancelled)"""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise JobCancelled()
+
+    def wait(self, timeout=None):
+        """Sleep up to timeout; returns True as soon as the token is cancelled"""
+        return self._event.wait(timeout)
+
+
+class Job:
+    """One unit of background work; target(token, *args, **kwargs) runs on its own thread"""
+
+    QUEUED = 'queued'
+    WAITING = 'waiting'  # Follow-up whose parent has not finished yet
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+    FINISHED_STATES = (DONE, FAILED, CANCELLED)
+
+    def __init__(self, job_id, job_type, target, args, kwargs, name=None, priority=100):
+        self.id = job_id
+        self.job_type = job_type
+        self.name = name or job_type
+        self.priority = priority
+        self.target = target
+        self.args = args
+        self.kwargs = kwargs
+        self.token = CancellationToken()
+        self.state = self.QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.follow_ups = []
+        self._done_callbacks = []
+        self._finished = threading.Event()
+
+    @property
+    def finished(self):
+        return self.state in self.FINISHED_STATES
+
+    @property
+    def succeeded(self):
+        return self.state == self.DONE
+
+    def cancel(self):
+        self.token.cancel()
+
+    def add_done_callback(self, callback):
+        """callback(job) after the job finishes, on the worker thread (immediately if finished)"""
+        if self.finished:
+            callback(self)
+        else:
+            self._done_callbacks.append(callback)
+
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+    def describe(self):
+        return {
+            'id': self.id,
+            'type': self.job_type,
+            'name': self.name,
+            'state': self.state,
+            'priority': self.priority,
+            'elapsed': (self.finished_at or time.time()) - (self.started_at or self.created_at)
+        }
+
+
+class JobManager:
+    """Runs jobs on named threads, never more than the per-type limit at once"""
+
+    LOAD = 'load'
+    CHECK = 'check'
+    REMOVE = 'remove'
+    INFO = 'info'
+    IMPORT = 'import'
+
+    # Lower value = started first
+    PRIORITY_HIGH = 0
+    PRIORITY_NORMAL = 100
+    PRIORITY_LOW = 200
+
+    DEFAULT_LIMITS = {
+        LOAD: 1,
+        CHECK: 1,
+        REMOVE: 1,
+        INFO: 2,
+        IMPORT: 1
+    }
+
+    def __init__(self, limits=None):
+        self.limits = {**self.DEFAULT_LIMITS, **(limits or {})}
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._jobs = {}       # id -> Job (queued, waiting or running)
+        self._listeners = []
+        self._shutdown = False
+
+    # --- Submission --------------------------------------------------------
+
+    def submit(self, job_type, target, *args, name=None, priority=None, replace=False, after=None, **kwargs):
+        """
+        Queue target(token, *args, **kwargs) as a job of job_type
+        replace=True cancels queued/running jobs of the same type (newest wins).
+        after=job makes this a follow-up that starts only if that job succeeds.
+        """
+        priority = self.PRIORITY_NORMAL if priority is None else priority
+        with self._lock:
+            if self._shutdown:
+                return None
+            if replace:
+                self._cancel_where(lambda j: j.job_type == job_type)
+            job = Job(next(self._ids), job_type, target, args, kwargs, name, priority)
+            if after is not None and not after.finished:
+                job.state = Job.WAITING
+                after.follow_ups.append(job)
+            elif after is not None and not after.succeeded:
+                job.state = Job.CANCELLED
+                job.token.cancel()
+                return job
+            self._jobs[job.id] = job
+        self._notify()
+        self._dispatch()
+        return job
+
+    # --- Queries -----------------------------------------------------------
+
+    def active_jobs(self):
+        """Snapshot of queued, waiting and running jobs, in priority order"""
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda j: (j.priority, j.id))
+            return [job.describe() for job in jobs]
+
+    def is_busy(self, job_types=None):
+        """True if any job (of job_types, when given) is queued, waiting or running"""
+        with self._lock:
+            return any(job_types is None or job.job_type in job_types for job in self._jobs.values())
+
+    def subscribe(self, callback):
+        """callback(active_jobs) whenever the job list changes; runs on the changing thread"""
+        with self._lock:
+            self._listeners.append(callback)
+
+    # --- Cancellation ------------------------------------------------------
+
+    def cancel(self, job):
+        with self._lock:
+            self._cancel_where(lambda j: j is job)
+        self._notify()
+        self._dispatch()
+
+    def cancel_type(self, *job_types):
+        with self._lock:
+            count = self._cancel_where(lambda j: j.job_type in job_types)
+        self._notify()
+        self._dispatch()
+        return count
+
+    def cancel_all(self):
+        with self._lock:
+            count = self._cancel_where(lambda j: True)
+        self._notify()
+        return count
+
+    def shutdown(self):
+        """Cancel everything; running targets see their tokens cancelled"""
+        with self._lock:
+            self._shutdown = True
+        self.cancel_all()
+
+    def _cancel_where(self, predicate):
+        count = 0
+        for job in list(self._jobs.values()):
+            if not predicate(job):
+                continue
+            job.token.cancel()
+            count += 1
+            if job.state in (Job.QUEUED, Job.WAITING):
+                # Never started: finish it here; running jobs finish on their thread
+                self._jobs.pop(job.id, None)
+                self._finish(job, Job.CANCELLED)
+        return count
+
+    # --- Scheduling --------------------------------------------------------
+
+    def _dispatch(self):
+        """Start queued jobs in priority order while their type is under its limit"""
+        to_start = []
+        with self._lock:
+            running = {}
+            for job in self._jobs.values():
+                if job.state == Job.RUNNING:
+                    running[job.job_type] = running.get(job.job_type, 0) + 1
+            queued = sorted(
+                (job for job in self._jobs.values() if job.state == Job.QUEUED),
+                key=lambda j: (j.priority, j.id)
+            )
+            for job in queued:
+                limit = self.limits.get(job.job_type, 1)
+                if running.get(job.job_type, 0) >= limit:
+                    continue
+                running[job.job_type] = running.get(job.job_type, 0) + 1
+                job.state = Job.RUNNING
+                job.started_at = time.time()
+                to_start.append(job)
+        for job in to_start:
+            threading.Thread(
+                target=self._run,
+                args=(job,),
+                name=f"job-{job.job_type}-{job.id}",
+                daemon=True
+            ).start()
+        if to_start:
+            self._notify()
+
+    def _run(self, job):
+        state = Job.DONE
+        try:
+            job.result = job.target(job.token, *job.args, **job.kwargs)
+            if job.token.is_cancelled:
+                state = Job.CANCELLED
+        except JobCancelled:
+            state = Job.CANCELLED
+        except Exception as e:
+            print(f"Error in job {job.name}: {e}")
+            job.error = e
+            state = Job.FAILED
+        with self._lock:
+            self._jobs.pop(job.id, None)
+            self._finish(job, state)
+        self._notify()
+        self._dispatch()
+
+    def _finish(self, job, state):
+        """Record the outcome, release or cancel follow-ups, fire done callbacks"""
+        job.state = state
+        job.finished_at = time.time()
+        for follow_up in job.follow_ups:
+            if state == Job.DONE and not follow_up.token.is_cancelled and not self._shutdown:
+                follow_up.state = Job.QUEUED
+            else:
+                follow_up.token.cancel()
+                self._jobs.pop(follow_up.id, None)
+                self._finish(follow_up, Job.CANCELLED)
+        job._finished.set()
+        for callback in job._done_callbacks:
+            try:
+                callback(job)
+            except Exception as e:
+                print(f"Error in job callback: {e}")
+
+    def _notify(self):
+        with self._lock:
+            listeners = list(self._listeners)
+        if not listeners:
+            return
+        snapshot = self.active_jobs()
+        for listener in listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"Error in job listener: {e}")
@@ -3,18 +3,33 @@ Playlist service operations
 Handles all playlist-related functionality
 """
 import re
-import requests
 import threading
-from googleapiclient.discovery import build
-import google.auth.exceptions
+
+def _refresh_error():
+    """google.auth's RefreshError, imported lazily (evaluated only when an exception is raised)"""
+    import google.auth.exceptions
+    return google.auth.exceptions.RefreshError
 
 class PlaylistService:
     """Service for handling YouTube playlist operations"""
     
-    def __init__(self, youtube_service=None):
-        self.youtube_service = youtube_service
+    def __init__(self, youtube_service=None, api_service=None):
+        self._youtube_client = youtube_service
+        # YouTubeAPIService whose client is shared instead of holding a separate one
+        self.api_service = api_service
         self.current_playlist_info = None
     
+    @property
+    def youtube_service(self):
+        """Data API client; follows api_service's current client when one is set"""
+        if self.api_service is not None and self.api_service.youtube is not None:
+            return self.api_service.youtube
+        return self._youtube_client
+    
+    @youtube_service.setter
+    def youtube_service(self, client):
+        self._youtube_client = client
+    
     def extract_playlist_id(self, playlist_url):
         """Extract playlist ID from YouTube URL"""
         try:
@@ -84,7 +99,7 @@ class PlaylistService:
             
             return None
             
-        except google.auth.exceptions.RefreshError:
+        except _refresh_error():
             print("Authentication expired. Please re-authenticate.")
             return None
         except Exception as e:
@@ -117,49 +132,139 @@ class PlaylistService:
                 return []
             
             videos = []
-            next_page_token = None
-            
-            while len(videos) < max_results:
-                request = self.youtube_service.playlistItems().list(
-                    part='snippet,contentDetails',
-                    playlistId=playlist_id,
-                    maxResults=min(50, max_results - len(videos)),
-                    pageToken=next_page_token
-                )
-                
-                response = request.execute()
-                
-                # Process videos
-                for item in response.get('items', []):
-                    snippet = item['snippet']
-                    video_id = snippet['resourceId']['videoId']
-                    
-                    video_info = {
-                        'id': video_id,
-                        'title': snippet['title'],
-                        'channel_title': snippet['channelTitle'],
-                        'published_at': snippet['publishedAt'],
-                        'thumbnail': snippet.get('thumbnails', {}).get('medium', {}).get('url', ''),
-                        'url': f"https://www.youtube.com/watch?v={video_id}",
-                        'playlist_item_id': item['id']
-                    }
-                    
-                    videos.append(video_info)
-                
-                # Check for next page
-                next_page_token = response.get('nextPageToken')
-                if not next_page_token:
-                    break
-            
+            for page in self.iter_playlist_pages(playlist_id, max_results):
+                videos.extend(page)
             return videos
             
-        except google.auth.exceptions.RefreshError:
+        except _refresh_error():
             print("Authentication expired. Please re-authenticate.")
             return []
         except Exception as e:
             print(f"Error getting playlist videos: {e}")
             return []
     
+    def iter_playlist_pages(self, playlist_id, max_results=None, token=None):
+        """
+        Yield a playlist's videos one API page (up to 50) at a time
+        Nothing but the current page is kept, so any playlist size streams in
+        bounded memory; max_results=None means every item. Errors propagate.
+        """
+        if not self.youtube_service:
+            return
+        
+        count = 0
+        next_page_token = None
+        
+        while max_results is None or count < max_results:
+            if token is not None and token.is_cancelled:
+                return
+            page_size = 50 if max_results is None else min(50, max_results - count)
+            request = self.youtube_service.playlistItems().list(
+                part='snippet',
+                playlistId=playlist_id,
+                maxResults=page_size,
+                pageToken=next_page_token
+            )
+            
+            response = request.execute()
+            
+            # Process videos
+            page = []
+            for item in response.get('items', []):
+                snippet = item['snippet']
+                video_id = snippet['resourceId']['videoId']
+                
+                video_info = {
+                    'id': video_id,
+                    'title': snippet['title'],
+                    'channel_title': snippet['channelTitle'],
+                    'published_at': snippet['publishedAt'],
+                    'thumbnail': snippet.get('thumbnails', {}).get('medium', {}).get('url', ''),
+                    'url': f"https://www.youtube.com/watch?v={video_id}",
+                    'playlist_item_id': item['id']
+                }
+                
+                page.append(video_info)
+            
+            count += len(page)
+            if page:
+                yield page
+            
+            # Check for next page
+            next_page_token = response.get('nextPageToken')
+            if not next_page_token:
+                break
+    
+    # --- Channels ----------------------------------------------------------
+    
+    def extract_channel_reference(self, url):
+        """
+        Return ('id', UC...), ('handle', '@name') or ('username', name) for a
+        channel URL or bare @handle, else None
+        """
+        try:
+            url = (url or '').strip()
+            if re.fullmatch(r'@[\w.\-]{3,100}', url):
+                return 'handle', url
+            if not re.search(r'(youtube\.com|youtu\.be)/', url):
+                return None
+            match = re.search(r'/channel/(UC[a-zA-Z0-9_-]{22})', url)
+            if match:
+                return 'id', match.group(1)
+            match = re.search(r'/(@[\w.\-]{3,100})', url)
+            if match:
+                return 'handle', match.group(1)
+            match = re.search(r'/user/([a-zA-Z0-9_.-]+)', url)
+            if match:
+                return 'username', match.group(1)
+            match = re.search(r'/c/([\w.\-]+)', url)
+            if match:
+                # Legacy custom URLs usually match the channel's handle
+                return 'handle', f"@{match.group(1)}"
+            return None
+            
+        except Exception as e:
+            print(f"Error extracting channel reference: {e}")
+            return None
+    
+    def is_valid_channel_url(self, url: str) -> bool:
+        """Check if URL is a YouTube channel URL or @handle (and not a playlist)"""
+        return not self.is_valid_playlist_url(url) and self.extract_channel_reference(url) is not None
+    
+    def resolve_channel(self, url):
+        """Resolve a channel URL/handle to {'id', 'title', 'uploads_playlist_id'} (1 quota unit)"""
+        try:
+            if not self.youtube_service:
+                return None
+            reference = self.extract_channel_reference(url)
+            if not reference:
+                return None
+            kind, value = reference
+            lookup = {'id': {'id': value}, 'handle': {'forHandle': value}, 'username': {'forUsername': value}}[kind]
+            
+            request = self.youtube_service.channels().list(
+                part='snippet,contentDetails',
+                **lookup
+            )
+            response = request.execute()
+            
+            if response.get('items'):
+                channel = response['items'][0]
+                return {
+                    'id': channel['id'],
+                    'title': channel['snippet']['title'],
+                    'uploads_playlist_id': channel['contentDetails']['relatedPlaylists']['uploads']
+                }
+            
+            return None
+            
+        except _refresh_error():
+            print("Authentication expired. Please re-authenticate.")
+            return None
+        except Exception as e:
+            print(f"Error resolving channel: {e}")
+            return None
+    
     def find_playlist_item_id(self, playlist_id, video_id):
         """Find playlist item ID for a specific video in playlist"""
         try:
@@ -170,7 +275,7 @@ class PlaylistService:
             
             while True:
                 request = self.youtube_service.playlistItems().list(
-                    part='snippet,contentDetails',
+                    part='contentDetails',
                     playlistId=playlist_id,
                     maxResults=50,
                     pageToken=next_page_token
@@ -179,7 +284,7 @@ class PlaylistService:
                 response = request.execute()
                 
                 for item in response.get('items', []):
-                    if item['snippet']['resourceId']['videoId'] == video_id:
+                    if item['contentDetails']['videoId'] == video_id:
                         return item['id']
                 
                 next_page_token = response.get('nextPageToken')
@@ -0,0 +1,181 @@
+"""
+Scan session journal
+Persists 4K scan progress incrementally so stopped or crashed scans can resume
+"""
+import os
+import re
+import json
+import time
+import uuid
+import threading
+from core.app_paths import get_app_data_dir
+
+class ScanSession:
+    """One scan's append-only journal: header, then one line per finished video"""
+
+    # Verdicts that never need re-checking; anything else (failed/timeout) is retried
+    DECISIVE_STATUSES = ("✅ 4K Available!", "❌ No 4K", "📱 SD Quality")
+    # Flush to disk at least every N records (journal lines are always written)
+    FSYNC_EVERY = 25
+
+    def __init__(self, path, session_id, source_key, source_url='', video_ids=None,
+                 results=None, started_at=None):
+        self.path = path
+        self.session_id = session_id
+        self.source_key = source_key
+        self.source_url = source_url
+        self.video_ids = list(video_ids or [])
+        self.results = dict(results or {})  # video_id -> last status
+        self.started_at = started_at or time.time()
+        self._fh = None
+        self._lock = threading.Lock()
+        self._unsynced = 0
+
+    @property
+    def done_ids(self):
+        return {vid for vid, status in self.results.items() if status in self.DECISIVE_STATUSES}
+
+    @property
+    def failed_ids(self):
+        return {vid for vid, status in self.results.items() if status not in self.DECISIVE_STATUSES}
+
+    def pending_ids(self):
+        """IDs from the original scan without a decisive verdict yet"""
+        done = self.done_ids
+        return [vid for vid in self.video_ids if vid not in done]
+
+    def summary(self):
+        return {
+            'total': len(self.video_ids),
+            'done': len(self.done_ids),
+            'failed': len(self.failed_ids),
+            'pending': len(self.pending_ids())
+        }
+
+    def _open_for_append(self):
+        if self._fh is None:
+            self._fh = open(self.path, 'a', encoding='utf-8')
+        return self._fh
+
+    def _write(self, record, sync=False):
+        fh = self._open_for_append()
+        fh.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+        fh.flush()
+        self._unsynced += 1
+        if sync or self._unsynced >= self.FSYNC_EVERY:
+            os.fsync(fh.fileno())
+            self._unsynced = 0
+
+    def write_header(self):
+        with self._lock:
+            self._write({
+                'type': 'start',
+                'session': self.session_id,
+                'source': self.source_key,
+                'url': self.source_url,
+                'started_at': self.started_at,
+                'videos': self.video_ids
+            }, sync=True)
+
+    def record(self, video_id, status):
+        """Journal one video's result"""
+        if not video_id:
+            return
+        with self._lock:
+            self.results[video_id] = status
+            try:
+                self._write({'type': 'result', 'id': video_id, 'status': status})
+            except Exception as e:
+                print(f"Error writing scan journal: {e}")
+
+    def close(self):
+        """Flush and close; the journal stays on disk for a later resume"""
+        with self._lock:
+            if self._fh is not None:
+                try:
+                    self._fh.flush()
+                    os.fsync(self._fh.fileno())
+                    self._fh.close()
+                except Exception:
+                    pass
+                self._fh = None
+
+    def complete(self):
+        """Scan finished: nothing left to resume, drop the journal"""
+        self.close()
+        try:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+        except Exception as e:
+            print(f"Error removing scan journal: {e}")
+
+
+class ScanSessionStore:
+    """Creates and finds scan journals, one per scanned source (e.g. playlist)"""
+
+    def __init__(self, sessions_dir=None):
+        self.sessions_dir = sessions_dir or get_app_data_dir('scan_sessions')
+        os.makedirs(self.sessions_dir, exist_ok=True)
+
+    def _path_for(self, source_key):
+        safe = re.sub(r'[^A-Za-z0-9_.-]', '_', str(source_key))
+        return os.path.join(self.sessions_dir, f"{safe}.jsonl")
+
+    def start(self, source_key, video_ids, source_url=''):
+        """Begin a fresh journal for source_key, replacing any previous one"""
+        path = self._path_for(source_key)
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except Exception:
+            pass
+        session = ScanSession(path, uuid.uuid4().hex, source_key, source_url, video_ids)
+        session.write_header()
+        return session
+
+    def load(self, source_key):
+        """Replay an existing journal, or None; torn trailing lines are skipped"""
+        path = self._path_for(source_key)
+        if not os.path.exists(path):
+            return None
+        session = None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    kind = record.get('type')
+                    if kind == 'start':
+                        session = ScanSession(
+                            path,
+                            record.get('session') or uuid.uuid4().hex,
+                            record.get('source', source_key),
+                            record.get('url', ''),
+                            record.get('videos', []),
+                            started_at=record.get('started_at')
+                        )
+                    elif kind == 'result' and session is not None:
+                        session.results[record.get('id')] = record.get('status')
+        except Exception as e:
+            print(f"Error reading scan journal: {e}")
+            return None
+        return session
+
+    def find_resumable(self, source_key):
+        """Return an unfinished session with at least one verdict, or None"""
+        if not source_key:
+            return None
+        session = self.load(source_key)
+        if session is None or not session.done_ids or not session.pending_ids():
+            return None
+        return session
+
+    def discard(self, source_key):
+        path = self._path_for(source_key)
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except Exception as e:
+            print(f"Error discarding scan journal: {e}")
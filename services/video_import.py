@@ -0,0 +1,166 @@
+"""
+Bulk video import service
+Streams video URLs/IDs from text or CSV files, clipboard text or a channel's
+uploads into detail batches
+"""
+import csv
+import itertools
+import re
+
+# 11-character video ID after the usual URL prefixes
+_URL_ID_PATTERN = re.compile(
+    r'(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/|/v/)([A-Za-z0-9_-]{11})(?![A-Za-z0-9_-])'
+)
+_BARE_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{11}$')
+# Plain words ("programming", "Interesting", "video_title") are never taken as bare IDs
+_WORD_PATTERN = re.compile(r'^[A-Z]?[a-z]+(?:[_-][a-z]+)*$')
+# Header names of a column holding video IDs or URLs
+ID_COLUMN_NAMES = ('id', 'video_id', 'videoid', 'video id', 'video', 'url', 'video_url', 'link')
+
+class VideoImporter:
+    """Turns line sources of video URLs/IDs into de-duplicated batches of video details"""
+
+    # videos().list accepts at most 50 IDs per call
+    BATCH_SIZE = 50
+
+    def __init__(self, youtube_service):
+        self.youtube_service = youtube_service
+
+    @staticmethod
+    def iter_file_lines(path):
+        """Lines of a text/CSV file, read lazily (the file is never loaded whole)"""
+        with open(path, 'r', encoding='utf-8-sig', errors='replace', newline='') as f:
+            for line in f:
+                yield line
+
+    @staticmethod
+    def iter_text_lines(text):
+        """Lines of clipboard text without building a list"""
+        for match in re.finditer(r'[^\r\n]+', text or ''):
+            yield match.group(0)
+
+    @staticmethod
+    def is_bare_id(token):
+        return bool(_BARE_ID_PATTERN.match(token)) and not _WORD_PATTERN.match(token)
+
+    @classmethod
+    def extract_ids(cls, cells, id_column=None):
+        """
+        Video IDs in one row: URLs in any cell, else bare IDs in cells made up
+        only of IDs (restricted to id_column when a header named it)
+        """
+        ids = [vid for cell in cells for vid in _URL_ID_PATTERN.findall(cell)]
+        if ids:
+            return ids
+        if id_column is not None:
+            cells = cells[id_column:id_column + 1]
+        for cell in cells:
+            tokens = cell.split()
+            if tokens and all(cls.is_bare_id(token) for token in tokens):
+                ids.extend(tokens)
+        return ids
+
+    @staticmethod
+    def looks_like_video_list(text):
+        """True if text holds video URLs, or every non-empty line is a bare ID (safe to auto-import)"""
+        has_line = False
+        all_bare = True
+        for match in re.finditer(r'[^\r\n]+', text or ''):
+            line = match.group(0).strip()
+            if not line:
+                continue
+            has_line = True
+            if _URL_ID_PATTERN.search(line):
+                return True
+            if all_bare and not VideoImporter.is_bare_id(line):
+                all_bare = False
+        return has_line and all_bare
+
+    @staticmethod
+    def _header_id_column(cells):
+        """Index of the ID/URL column if cells look like a header row, else None"""
+        names = [cell.strip().lower() for cell in cells]
+        for name in ID_COLUMN_NAMES:
+            if name in names:
+                return names.index(name)
+        return None
+
+    def iter_video_ids(self, lines, stats=None):
+        """
+        Unique video IDs from text/CSV lines in first-seen order; stats (dict) gets
+        line/duplicate counts. A header row naming an ID/URL column is skipped and
+        limits bare-ID matching to that column.
+        """
+        stats = stats if stats is not None else {}
+        stats.setdefault('lines', 0)
+        
+        def ids_from_lines():
+            line_iter = iter(lines)
+            first = next(line_iter, None)
+            if first is None:
+                return
+            rows = csv.reader(itertools.chain([first], line_iter), delimiter=self._sniff_delimiter(first))
+            id_column = None
+            for row_number, cells in enumerate(rows):
+                stats['lines'] += 1
+                if row_number == 0:
+                    id_column = self._header_id_column(cells)
+                    if id_column is not None:
+                        continue
+                yield from self.extract_ids(cells, id_column)
+        
+        return self.unique_ids(ids_from_lines(), stats)
+
+    @staticmethod
+    def _sniff_delimiter(first_line):
+        """Cell delimiter guessed from the first line (tab, semicolon or comma)"""
+        if '\t' in first_line:
+            return '\t'
+        if ';' in first_line and ',' not in first_line:
+            return ';'
+        return ','
+
+    @staticmethod
+    def unique_ids(video_ids, stats=None):
+        """Drop repeated IDs (only a set of seen IDs is kept)"""
+        seen = set()
+        stats = stats if stats is not None else {}
+        stats.setdefault('duplicates', 0)
+        for video_id in video_ids:
+            if video_id in seen:
+                stats['duplicates'] += 1
+                continue
+            seen.add(video_id)
+            yield video_id
+
+    def iter_batches(self, video_ids):
+        batch = []
+        for video_id in video_ids:
+            batch.append(video_id)
+            if len(batch) >= self.BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def iter_video_details(self, video_ids, token=None, stats=None):
+        """
+        Yield lists of video detail dicts for video_ids, one videos().list batch at a time
+        Only the current batch is held in memory; IDs the API does not return
+        (deleted/private) are counted in stats['missing'] and skipped.
+        """
+        stats = stats if stats is not None else {}
+        stats.setdefault('missing', 0)
+        for batch in self.iter_batches(video_ids):
+            if token is not None and token.is_cancelled:
+                return
+            details = self.youtube_service.get_video_details(batch)
+            videos = []
+            for video_id in batch:
+                video = details.get(video_id)
+                # Placeholders from failed batches are kept; unknown IDs are dropped
+                if video:
+                    videos.append(video)
+                else:
+                    stats['missing'] += 1
+            yield videos
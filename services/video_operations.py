@@ -4,16 +4,17 @@ Handles video-related operations like copying, removing, etc.
 """
 import tkinter as tk
 from tkinter import messagebox
-import threading
 import webbrowser
+from .job_manager import JobManager
 
 class VideoOperations:
     """Service for video operations and management"""
     
-    def __init__(self, ui_manager, playlist_service, theme_config=None):
+    def __init__(self, ui_manager, playlist_service, theme_config=None, jobs=None):
         self.ui_manager = ui_manager
         self.playlist_service = playlist_service
         self.theme_config = theme_config
+        self.jobs = jobs or JobManager()
         self.checked_videos = []
         # Tree manager is set later by main_app after creation
         self.tree_manager = None
@@ -83,25 +84,20 @@ class VideoOperations:
 
             # Persist copy history and set copied icon
             try:
-                cfg = self.ui_manager.get_element('config_manager')
+                catalog = self.ui_manager.get_element('catalog')
                 tree_manager = getattr(self, 'tree_manager', None)
-                if cfg and tree_manager:
-                    existing = set(cfg.get('history.copied_video_ids', []) or [])
-                    changed = False
+                if catalog and tree_manager:
+                    video_ids = []
                     for item in selected:
-                        meta = tree_manager.video_data.get(item, {})
-                        vid = meta.get('id')
-                        if vid and vid not in existing:
-                            existing.add(vid)
-                            changed = True
+                        vid = tree_manager.video_data.get(item, {}).get('id')
+                        if vid:
+                            video_ids.append(vid)
                         # Mark visually
                         try:
                             tree_manager.set_copied_icon(tree, item, copied=True)
                         except Exception:
                             pass
-                    if changed:
-                        cfg.set('history', {**(cfg.get('history', {}) or {}), 'copied_video_ids': list(existing)})
-                        cfg.save_config()
+                    catalog.mark_copied(video_ids)
             except Exception as e:
                 print(f"Error updating copy history: {e}")
             
@@ -282,14 +278,12 @@ class VideoOperations:
             if not tree:
                 return
             
-            removed_count = 0
-            
             # Remove from tree
-            for item in tree.get_children():
-                checkbox_value = tree.set(item, 'checkbox')
-                if checkbox_value == '☑':
-                    tree.delete(item)
-                    removed_count += 1
+            to_remove = [
+                item for item in tree.get_children()
+                if tree.set(item, 'checkbox') == '☑'
+            ]
+            removed_count = self._delete_tree_items(tree, to_remove)
             
             self.ui_manager.update_status(f"🗑️ {removed_count} videos removed from list")
             self.update_video_count()
@@ -322,13 +316,11 @@ class VideoOperations:
                 self.ui_manager.update_status("🔄 Removing videos from YouTube playlist...")
                 self.ui_manager.set_checking_state(True)
                 
-                # Start removal in background thread
-                thread = threading.Thread(
-                    target=self._remove_from_playlist_thread,
-                    args=(video_data,),
-                    daemon=True
+                # Start removal as a background job
+                self.jobs.submit(
+                    JobManager.REMOVE, self._remove_from_playlist_thread, video_data,
+                    name=f"Remove {len(video_data)} from playlist"
                 )
-                thread.start()
             
         except Exception as e:
             print(f"Error removing from YouTube: {e}")
@@ -338,8 +330,8 @@ class VideoOperations:
                 'error'
             )
     
-    def _remove_from_playlist_thread(self, video_data):
-        """Background thread for playlist removal"""
+    def _remove_from_playlist_thread(self, token, video_data):
+        """Job: remove videos from the YouTube playlist"""
         try:
             def progress_callback(current, total, removed, failed):
                 self.ui_manager.update_status(
@@ -359,8 +351,7 @@ class VideoOperations:
                     tree = self.ui_manager.get_element('video_tree')
                     if tree:
                         items_to_remove = list(tree.selection())
-                        for item in items_to_remove:
-                            tree.delete(item)
+                        self._delete_tree_items(tree, items_to_remove)
                         
                         self.update_video_count()
                 
@@ -409,7 +400,7 @@ class VideoOperations:
             )
             
             if result:
-                tree.delete(item)
+                self._delete_tree_items(tree, [item])
                 self.ui_manager.update_status("🗑️ Video removed from list")
                 self.update_video_count()
         
@@ -472,6 +463,16 @@ class VideoOperations:
         except Exception as e:
             print(f"Error updating copy button: {e}")
 
+    def _delete_tree_items(self, tree, items):
+        """Delete rows through TreeManager so their data and images are released."""
+        tree_manager = getattr(self, 'tree_manager', None)
+        if tree_manager:
+            return tree_manager.delete_items(tree, items)
+        existing = [item for item in items if tree.exists(item)]
+        if existing:
+            tree.delete(*existing)
+        return len(existing)
+
     def _get_video_meta(self, item):
         """Helper to get full stored metadata for a tree item."""
         try:
@@ -4,16 +4,37 @@ Handles video list tree operations and interactions
 """
 import tkinter as tk
 from tkinter import ttk
+from core.search_index import VideoSearchIndex
+from core.thumbnail_loader import ThumbnailLoader
 
 class TreeManager:
     """Manager for video list tree widget operations"""
     
-    def __init__(self, ui_manager, thumbnail_manager, theme_config=None):
+    THUMBNAIL_SIZE = (120, 68)
+    # Rows above/below the viewport whose thumbnails are fetched ahead of scrolling
+    PREFETCH_ROWS = 10
+    # Rows further than this from the viewport give their PhotoImage back
+    RELEASE_MARGIN_ROWS = 30
+    # Rows hidden by filters keep their image this long before releasing it
+    DETACHED_RELEASE_SECONDS = 30
+    IMAGE_SWEEP_MS = 5000
+    
+    def __init__(self, ui_manager, thumbnail_manager, theme_config=None, thumbnail_loader=None):
         self.ui_manager = ui_manager
         self.thumbnail_manager = thumbnail_manager
         self.theme_config = theme_config
+        # Shared bounded pool for thumbnail loads (no thread per row)
+        self.thumbnail_loader = thumbnail_loader or ThumbnailLoader(
+            thumbnail_manager, size=self.THUMBNAIL_SIZE
+        )
+        self._visible_after_id = None
+        self._row_images = {}  # item_id -> PhotoImage currently shown on that row
+        self._detached_since = {}  # item_id -> time its row (with image) was first seen detached
+        self.images_released = 0
+        self._thumb_requested = set()  # item_ids with a queued/running thumbnail load
         self.video_data = {}  # Store video data by item ID
         self.video_id_index = {}  # Map video_id -> tree item_id
+        self.search_index = VideoSearchIndex()  # Title/channel search over loaded rows
     
     def create_video_tree(self, parent):
         """Create and configure video list tree"""
@@ -80,7 +101,13 @@ class TreeManager:
 
         # Scrollbar
         scrollbar = ttk.Scrollbar(tree_container, orient='vertical', command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
+
+        def on_yscroll(first, last):
+            scrollbar.set(first, last)
+            # Thumbnails follow the viewport
+            self._schedule_visible_refresh(tree)
+
+        tree.configure(yscrollcommand=on_yscroll)
 
         # Pack tree and scrollbar
         tree.pack(side='left', fill='both', expand=True)
@@ -98,6 +125,9 @@ class TreeManager:
         self.ui_manager.register_element('video_tree', tree)
         self.ui_manager.register_element('tree_scrollbar', scrollbar)
 
+        # Periodically reclaim images of deleted or long-hidden rows
+        tree.after(self.IMAGE_SWEEP_MS, lambda: self._sweep_row_images(tree))
+
         return tree
     
     def add_video_to_tree(self, tree, video_data):
@@ -105,14 +135,7 @@ class TreeManager:
         try:
             # Date removed from UI
 
-            # Prepare title (prefix with [EN] if detected via API)
             raw_title = video_data.get('title', 'Unknown Title')
-            title_prefix = '[EN] ' if video_data.get('is_english') else ''
-            display_title_full = f"{title_prefix}{raw_title}".strip()
-            # Prefix indicator if previously copied
-            if self._is_previously_copied(video_data.get('id')):
-                display_title_full = f"📋 {display_title_full}"
-            display_title = display_title_full[:50] + ('...' if len(display_title_full) > 50 else '')
 
             # Add to tree
             item_id = tree.insert(
@@ -120,11 +143,14 @@ class TreeManager:
                 'end',
                 image='',  # Thumbnail will be loaded later
                 values=(
-                    display_title,
+                    self._display_title(video_data),
                     video_data.get('channel_title', 'Unknown Channel')[:25],
                     self._format_quality_initial(video_data.get('definition', 'hd')),
                 ),
             )
+            if video_data.get('4k_status'):
+                # Restored rows carry their last check result
+                tree.set(item_id, 'status', self._map_status_to_quality(video_data['4k_status']))
             
             # Store video data
             self.video_data[item_id] = {
@@ -136,12 +162,12 @@ class TreeManager:
             vid = video_data.get('id')
             if vid:
                 self.video_id_index[vid] = item_id
+            self.search_index.add(item_id, raw_title, video_data.get('channel_title', ''))
             
             # Additional metadata is stored in self.video_data and video_id_index
             
-            # Load thumbnail asynchronously
-            if video_data.get('thumbnail'):
-                self.load_video_thumbnail(tree, item_id, video_data)
+            # Thumbnail is loaded lazily once the row nears the viewport
+            self._schedule_visible_refresh(tree)
             
             return item_id
             
@@ -149,42 +175,244 @@ class TreeManager:
             print(f"Error adding video to tree: {e}")
             return None
     
-    def load_video_thumbnail(self, tree, item_id, video_data):
-        """Load thumbnail for video item"""
+    def _display_title(self, video_data):
+        """Title cell text: [EN] and copied prefixes, truncated to 50 characters"""
+        # Prefix with [EN] if detected via API
+        raw_title = video_data.get('title', 'Unknown Title')
+        title_prefix = '[EN] ' if video_data.get('is_english') else ''
+        display_title_full = f"{title_prefix}{raw_title}".strip()
+        # Prefix indicator if previously copied
+        if self._is_previously_copied(video_data.get('id')):
+            display_title_full = f"📋 {display_title_full}"
+        return display_title_full[:50] + ('...' if len(display_title_full) > 50 else '')
+
+    # Fields a revalidation may change on an existing row
+    REFRESHED_FIELDS = ('title', 'channel_title', 'definition', 'dimension', 'thumbnail',
+                        'is_english', 'playlist_item_id', 'published_at')
+    # What playlistItems alone tells us; the rest of a placeholder video is a guess
+    PLAYLIST_FIELDS = ('title', 'channel_title', 'thumbnail', 'playlist_item_id', 'published_at')
+
+    def apply_playlist_diff(self, tree, videos):
+        """
+        Bring the rows in line with videos (playlist order), touching only what changed:
+        missing videos are removed, new ones added, changed ones updated in place.
+        Check results, selections and loaded thumbnails of unchanged rows are kept.
+        Returns (added, removed, updated).
+        """
+        wanted = {v.get('id') for v in videos if v.get('id')}
+        stale = [item for vid, item in self.video_id_index.items() if vid not in wanted]
+        stale += [item for item, data in self.video_data.items() if not data.get('id')]
+        removed = self.delete_items(tree, stale)
+
+        added = updated = 0
+        ordered_items = []
+        for video in videos:
+            vid = video.get('id')
+            if not vid:
+                continue
+            item = self.video_id_index.get(vid)
+            if item is None or item not in self.video_data or not tree.exists(item):
+                item = self.add_video_to_tree(tree, video)
+                if item is None:
+                    continue
+                added += 1
+            elif self._refresh_row(tree, item, video):
+                updated += 1
+            ordered_items.append(item)
+
+        # Load order (used by filters) and attached row order follow the playlist
+        reordered = {item: self.video_data[item] for item in ordered_items if item in self.video_data}
+        self.video_data.clear()
+        self.video_data.update(reordered)
+        attached = set(tree.get_children())
+        order = [item for item in ordered_items if item in attached]
+        if order != list(tree.get_children()):
+            tree.set_children('', *order)
+        self._schedule_visible_refresh(tree)
+        return added, removed, updated
+
+    def _refresh_row(self, tree, item, video):
+        """Update a row whose video changed upstream; returns True if anything changed"""
+        data = self.video_data[item]
+        fields = self.PLAYLIST_FIELDS if video.get('details_unavailable') else self.REFRESHED_FIELDS
+        changes = {
+            key: video[key] for key in fields
+            if key in video and video[key] != data.get(key)
+        }
+        if not changes:
+            return False
+        data.update(changes)
+        tree.set(item, 'title', self._display_title(data))
+        tree.set(item, 'channel', data.get('channel_title', 'Unknown Channel')[:25])
+        if 'definition' in changes and not data.get('4k_status'):
+            tree.set(item, 'status', self._format_quality_initial(data.get('definition', 'hd')))
+        if 'title' in changes or 'channel_title' in changes:
+            self.search_index.remove(item)
+            self.search_index.add(item, data.get('title', ''), data.get('channel_title', ''))
+        if 'thumbnail' in changes:
+            # Fetch the new image next time the row is near the viewport
+            self._release_row_image(tree, item)
+        return True
+
+    def load_video_thumbnail(self, tree, item_id, video_data, priority=None):
+        """Queue thumbnail load for video item on the shared worker pool"""
         try:
             video_id = video_data.get('id')
             thumbnail_url = video_data.get('thumbnail')
             
             if video_id and thumbnail_url:
-                # Load thumbnail in background
-                import threading
-                
-                def load_thumbnail():
-                    try:
-                        photo = self.thumbnail_manager.get_thumbnail_image(
-                            video_id, thumbnail_url, (120, 68)
-                        )
-                        
-                        if photo:
-                            def update_tree():
-                                if tree.exists(item_id):
-                                    # Use correct API to set image on tree item
-                                    tree.item(item_id, image=photo)
-                                    # Keep reference to prevent garbage collection
-                                    tree.image = getattr(tree, 'image', [])
-                                    tree.image.append(photo)
-                            
-                            self.ui_manager.safe_update(update_tree)
-                            
-                    except Exception as e:
-                        print(f"Error loading thumbnail for {video_id}: {e}")
+                def on_loaded(key, photo):
+                    def update_tree():
+                        self._thumb_requested.discard(key)
+                        if photo is None:
+                            return  # Failed: the row asks again when next on screen
+                        if key in self.video_data and tree.exists(key):
+                            # Use correct API to set image on tree item
+                            tree.item(key, image=photo)
+                            # Row owns the reference (prevents garbage collection)
+                            self._row_images[key] = photo
+                    
+                    self.ui_manager.safe_update(update_tree)
                 
-                thread = threading.Thread(target=load_thumbnail, daemon=True)
-                thread.start()
+                if self.thumbnail_loader.request(item_id, video_id, thumbnail_url, on_loaded, priority=priority):
+                    self._thumb_requested.add(item_id)
                 
         except Exception as e:
             print(f"Error in thumbnail loading setup: {e}")
 
+    def _schedule_visible_refresh(self, tree):
+        """Coalesce scroll/insert bursts into one viewport pass"""
+        try:
+            if self._visible_after_id is None:
+                self._visible_after_id = tree.after_idle(lambda: self._refresh_visible_rows(tree))
+        except Exception:
+            self._visible_after_id = None
+
+    def _get_viewport_range(self, tree, children):
+        """Return (first, last) child positions inside the viewport, or None"""
+        top = tree.identify_row(1)
+        if not top:
+            return None
+        bottom = tree.identify_row(max(1, tree.winfo_height() - 2))
+        start = tree.index(top)
+        end = tree.index(bottom) if bottom else len(children) - 1
+        return start, end
+
+    def get_visible_items(self, tree):
+        """Return item IDs currently inside the tree viewport"""
+        try:
+            children = tree.get_children()
+            viewport = self._get_viewport_range(tree, children)
+            if viewport is None:
+                return []
+            start, end = viewport
+            return list(children[start:end + 1])
+        except Exception:
+            return []
+
+    def _refresh_visible_rows(self, tree):
+        """Fetch thumbnails for rows in/near the viewport and release far-away ones"""
+        self._visible_after_id = None
+        try:
+            children = tree.get_children()
+            viewport = self._get_viewport_range(tree, children) if children else None
+            if viewport is None:
+                return
+            start, end = viewport
+            count = len(children)
+
+            # Request visible rows first, then the prefetch margin by distance
+            lo = max(0, start - self.PREFETCH_ROWS)
+            hi = min(count, end + 1 + self.PREFETCH_ROWS)
+            window = children[lo:hi]
+            for pos, item in enumerate(window, lo):
+                if item in self._row_images:
+                    continue
+                distance = start - pos if pos < start else max(0, pos - end)
+                if item in self._thumb_requested:
+                    self.thumbnail_loader.prioritize([item], priority=distance)
+                    continue
+                video_data = self.video_data.get(item)
+                if video_data and video_data.get('thumbnail'):
+                    self.load_video_thumbnail(tree, item, video_data, priority=distance)
+
+            # Rows scrolled away before their turn no longer need a download
+            stale = self._thumb_requested.difference(window)
+            for item in stale:
+                self.thumbnail_loader.cancel(item)
+            self._thumb_requested.difference_update(stale)
+
+            # Give back images of attached rows far outside the viewport
+            keep = set(children[max(0, start - self.RELEASE_MARGIN_ROWS):end + 1 + self.RELEASE_MARGIN_ROWS])
+            far = [item for item in self._row_images if item not in keep]
+            if far:
+                attached = set(children)
+                for item in far:
+                    if item in attached:
+                        self._release_row_image(tree, item)
+        except Exception as e:
+            print(f"Error refreshing visible thumbnails: {e}")
+
+    def _release_row_image(self, tree, item):
+        """Drop the row's PhotoImage so Tk can free it"""
+        photo = self._row_images.pop(item, None)
+        self._detached_since.pop(item, None)
+        if photo is not None:
+            self.images_released += 1
+            try:
+                if tree.exists(item):
+                    tree.item(item, image='')
+            except Exception:
+                pass
+        return photo is not None
+
+    def _sweep_row_images(self, tree):
+        """Release images of rows deleted behind our back or detached for long"""
+        try:
+            if self._row_images:
+                import time
+                now = time.time()
+                attached = set(tree.get_children())
+                for item in list(self._row_images):
+                    if item in attached:
+                        self._detached_since.pop(item, None)
+                    elif not tree.exists(item):
+                        # Deleted directly via the widget: forget everything about it
+                        self._forget_item(item)
+                    else:
+                        since = self._detached_since.setdefault(item, now)
+                        if now - since >= self.DETACHED_RELEASE_SECONDS:
+                            self._release_row_image(tree, item)
+        except Exception as e:
+            print(f"Error sweeping row images: {e}")
+        finally:
+            try:
+                tree.after(self.IMAGE_SWEEP_MS, lambda: self._sweep_row_images(tree))
+            except Exception:
+                pass
+
+    def get_image_memory_report(self):
+        """Live thumbnail images held by rows, plus thumbnail cache counters"""
+        live_bytes = 0
+        for photo in self._row_images.values():
+            try:
+                live_bytes += photo.width() * photo.height() * 4
+            except Exception:
+                pass
+        report = {
+            'rows': len(self.video_data),
+            'row_images': len(self._row_images),
+            'row_images_mb': live_bytes / (1024 * 1024),
+            'detached_with_image': len(self._detached_since),
+            'pending_thumbnail_loads': len(self._thumb_requested),
+            'images_released': self.images_released
+        }
+        try:
+            report['cache'] = self.thumbnail_manager.get_cache_stats()
+        except Exception:
+            pass
+        return report
+
     def on_select_changed(self, event):
         """Update action buttons when selection changes"""
         try:
@@ -221,6 +449,9 @@ class TreeManager:
                 # Update stored data
                 if item_id in self.video_data:
                     self.video_data[item_id]['4k_status'] = status
+                    catalog = self._get_catalog()
+                    if catalog:
+                        catalog.record_check_result(self.video_data[item_id].get('id'), status)
                     
         except Exception as e:
             print(f"Error updating video status: {e}")
@@ -231,18 +462,33 @@ class TreeManager:
         except Exception:
             return None
 
+    def _get_catalog(self):
+        try:
+            return self.ui_manager.get_element('catalog')
+        except Exception:
+            return None
+
     def _is_previously_copied(self, video_id):
         try:
             if not video_id:
                 return False
-            cfg = self._get_config_manager()
-            if not cfg:
+            catalog = self._get_catalog()
+            if not catalog:
                 return False
-            copied = cfg.get('history.copied_video_ids', []) or []
-            return video_id in copied
+            return catalog.is_copied(video_id)
         except Exception:
             return False
 
+    def get_copied_items(self, items=None):
+        """Tree items (default: all known rows) whose video was copied before"""
+        catalog = self._get_catalog()
+        if not catalog:
+            return []
+        items = list(self.video_data.keys()) if items is None else list(items)
+        ids_by_item = {item: self.video_data.get(item, {}).get('id') for item in items}
+        copied_ids = catalog.copied_among(vid for vid in ids_by_item.values() if vid)
+        return [item for item, vid in ids_by_item.items() if vid in copied_ids]
+
     def set_copied_icon(self, tree, item, copied=True):
         """Toggle the copied indicator on the title cell for a tree item."""
         try:
@@ -258,15 +504,7 @@ class TreeManager:
     def select_previously_copied(self, tree):
         """Select all items that were previously copied."""
         try:
-            copied_ids = set(self._get_config_manager().get('history.copied_video_ids', []) or []) if self._get_config_manager() else set()
-            if not copied_ids:
-                return
-            to_select = []
-            for item in tree.get_children():
-                meta = self.video_data.get(item, {})
-                vid = meta.get('id')
-                if vid and vid in copied_ids:
-                    to_select.append(item)
+            to_select = self.get_copied_items(tree.get_children())
             if to_select:
                 tree.selection_set(to_select)
         except Exception as e:
@@ -436,15 +674,8 @@ class TreeManager:
             )
             
             if result:
-                # Remove from stored data
-                if item in self.video_data:
-                    vid = self.video_data[item].get('id')
-                    if vid and vid in self.video_id_index:
-                        del self.video_id_index[vid]
-                    del self.video_data[item]
-                
-                # Remove from tree
-                tree.delete(item)
+                # Remove from stored data and tree
+                self.delete_items(tree, [item])
                 self.ui_manager.update_status("🗑️ Video removed from list")
                 
         except Exception as e:
@@ -456,16 +687,7 @@ class TreeManager:
             selection = list(tree.selection())
             if not selection:
                 return
-            for item in selection:
-                # Clean stored indices
-                if item in self.video_data:
-                    vid = self.video_data[item].get('id')
-                    if vid and vid in self.video_id_index:
-                        del self.video_id_index[vid]
-                    del self.video_data[item]
-                # Remove from tree
-                if tree.exists(item):
-                    tree.delete(item)
+            self.delete_items(tree, selection)
             self.ui_manager.update_status(f"🗑️ Removed {len(selection)} item(s) from list")
         except Exception as e:
             print(f"Error removing selected items: {e}")
@@ -505,24 +727,66 @@ class TreeManager:
         except Exception as e:
             print(f"Error removing selected from YouTube: {e}")
     
+    def delete_items(self, tree, items):
+        """Delete rows from the tree, releasing their data, index entries and images"""
+        existing = []
+        for item in items:
+            self._forget_item(item)
+            if tree.exists(item):
+                existing.append(item)
+        if existing:
+            tree.delete(*existing)
+        return len(existing)
+
     def clear_tree(self, tree):
         """Clear all items from tree"""
         try:
+            # Include rows currently detached by filters
+            known_items = [item for item in self.video_data if tree.exists(item)]
+            
             # Clear stored data
             self.video_data.clear()
             self.video_id_index.clear()
+            self.search_index.clear()
+            self.thumbnail_loader.cancel_all()
+            self._thumb_requested.clear()
             
             # Clear tree
-            for item in tree.get_children():
-                tree.delete(item)
+            remaining = set(tree.get_children())
+            remaining.update(known_items)
+            if remaining:
+                tree.delete(*remaining)
                 
             # Clear image references
-            if hasattr(tree, 'image'):
-                tree.image.clear()
+            self.images_released += len(self._row_images)
+            self._row_images.clear()
+            self._detached_since.clear()
                 
         except Exception as e:
             print(f"Error clearing tree: {e}")
 
+    def _forget_item(self, item):
+        """Drop stored data and index entries for a tree item"""
+        if item in self.video_data:
+            vid = self.video_data[item].get('id')
+            if vid and self.video_id_index.get(vid) == item:
+                del self.video_id_index[vid]
+            del self.video_data[item]
+        self.search_index.remove(item)
+        self.thumbnail_loader.cancel(item)
+        self._thumb_requested.discard(item)
+        if self._row_images.pop(item, None) is not None:
+            self.images_released += 1
+        self._detached_since.pop(item, None)
+
+    def search_items(self, query):
+        """Return item IDs whose title/channel match query, or None for no filter"""
+        try:
+            return self.search_index.search(query)
+        except Exception as e:
+            print(f"Error searching videos: {e}")
+            return None
+
     def get_item_id_by_video_id(self, video_id):
         """Get tree item id by video id"""
         try:
@@ -173,12 +173,22 @@ class WidgetFactory:
         )
         paste_button.pack(side='right', padx=(0, 5))
         
+        # Import button (text/CSV file of video URLs or IDs)
+        import_button = ttk.Button(
+            url_frame,
+            text="📥",
+            width=3,
+            style='Tool.TButton'
+        )
+        import_button.pack(side='right', padx=(0, 5))
+        
     # Note: Load button and Auto-check option removed per user request
         
         return {
             'frame': input_frame,
             'url_entry': url_entry,
             'paste_button': paste_button,
+            'import_button': import_button,
             'info_label': info_label,
             # auto_check_4k and load_button removed
         }
@@ -506,6 +516,26 @@ class WidgetFactory:
             style='Accent.TCheckbutton'
         )
         filter_copied_check.pack(side='left', padx=(12, 0))
+
+        # Search row (title/channel, combined with the toggles above)
+        search_frame = tk.Frame(filter_frame, bg=self.colors['bg_secondary'])
+        search_frame.pack(fill='x', padx=5, pady=(8, 0))
+
+        search_label = tk.Label(
+            search_frame,
+            text="🔎 Search:",
+            bg=self.colors['bg_secondary'],
+            fg=self.colors['text_primary'],
+            font=('Segoe UI', 9)
+        )
+        search_label.pack(side='left', padx=(0, 5))
+
+        search_entry = ttk.Entry(
+            search_frame,
+            font=('Segoe UI', 9),
+            style='Modern.TEntry'
+        )
+        search_entry.pack(side='left', fill='x', expand=True)
         
         return {
             'frame': filter_frame,
@@ -514,5 +544,6 @@ class WidgetFactory:
             'filter_4k_var': filter_4k_var,
             'filter_4k_check': filter_4k_check,
             'filter_copied_var': filter_copied_var,
-            'filter_copied_check': filter_copied_check
+            'filter_copied_check': filter_copied_check,
+            'search_entry': search_entry
         }